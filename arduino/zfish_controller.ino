@@ -27,6 +27,9 @@ VIB <0-255>
 PUMP <0-255>
 
 ALL outputs are PWM controlled.
+
+PUSHED (unsolicited, every TEMP_PUSH_MS):
+TEMP <celsius>
 ----------------------------------------------------
 */
 
@@ -40,6 +43,9 @@ ALL outputs are PWM controlled.
 #define PIN_PUMP      10
 #define PIN_TEMP      2
 
+/* ================= TIMING ================= */
+#define TEMP_PUSH_MS  2000
+
 /* ================= OBJECTS ================= */
 OneWire oneWire(PIN_TEMP);
 DallasTemperature tempSensor(&oneWire);
@@ -50,6 +56,8 @@ uint8_t whiteLevel = 0;
 uint8_t vibLevel   = 0;
 uint8_t pumpLevel  = 0;
 
+unsigned long lastTempPush = 0;
+
 /* ================= SETUP ================= */
 void setup() {
   Serial.begin(115200);
@@ -67,6 +75,9 @@ void setup() {
   analogWrite(PIN_PUMP, 0);
 
   tempSensor.begin();
+  // Conversions run in the background; the loop collects them on its cadence
+  tempSensor.setWaitForConversion(false);
+  tempSensor.requestTemperatures();
 
   Serial.println("ZIMON_MEGA_READY");
   Serial.println("Commands: IR, WHITE, VIB, PUMP, TEMP?, STATUS");
@@ -80,6 +91,11 @@ void loop() {
     cmd.toUpperCase();
     processCommand(cmd);
   }
+
+  if (millis() - lastTempPush >= TEMP_PUSH_MS) {
+    lastTempPush = millis();
+    pushTemperature();
+  }
 }
 
 /* ================= COMMAND HANDLER ================= */
@@ -141,7 +157,9 @@ uint8_t parsePWM(String cmd) {
 }
 
 void readTemperature() {
+  tempSensor.setWaitForConversion(true);
   tempSensor.requestTemperatures();
+  tempSensor.setWaitForConversion(false);
   float t = tempSensor.getTempCByIndex(0);
 
   if (t == DEVICE_DISCONNECTED_C) {
@@ -152,6 +170,17 @@ void readTemperature() {
   }
 }
 
+void pushTemperature() {
+  // Read the conversion started last period, then start the next one
+  float t = tempSensor.getTempCByIndex(0);
+  tempSensor.requestTemperatures();
+
+  if (t != DEVICE_DISCONNECTED_C) {
+    Serial.print("TEMP ");
+    Serial.println(t, 2);
+  }
+}
+
 void printStatus() {
   Serial.print("STATUS ");
   Serial.print("IR=");    Serial.print(irLevel);
@@ -1,13 +1,134 @@
 # backend/arduino_controller.py
 import serial
+import serial.threaded
 import serial.tools.list_ports
+import asyncio
+import ctypes
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import struct
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Optional
 
+# Optional asyncio transport - checked before use
+try:
+    import serial_asyncio
+    SERIAL_ASYNCIO_AVAILABLE = True
+except ImportError:
+    SERIAL_ASYNCIO_AVAILABLE = False
+    serial_asyncio = None
+
 LOG = logging.getLogger("arduino_controller")
 LOG.addHandler(logging.NullHandler())
 
+# fixed commands, encoded once
+_CMD_PING = b"PING\n"
+_CMD_TEMP = b"TEMP?\n"
+
+# prefix of the temperature lines the firmware pushes on its own cadence
+_TEMP_PUSH = b"TEMP "
+
+# a reading younger than this is returned by read_temperature_c() without a TEMP? round-trip
+_TEMP_TTL = 0.5
+
+# linux/serial.h
+_ASYNC_LOW_LATENCY = 1 << 13
+
+# comports() walks SetupDi/sysfs on every call; USB topology rarely changes
+_PORT_CACHE = {"t": 0.0, "v": []}
+
+
+def _cached_comports(ttl: float = 3.0):
+    """Return serial.tools.list_ports.comports(), reusing the last result for ttl seconds."""
+    now = time.monotonic()
+    if _PORT_CACHE["t"] and now - _PORT_CACHE["t"] < ttl:
+        return _PORT_CACHE["v"]
+    _PORT_CACHE["v"] = list(serial.tools.list_ports.comports())
+    _PORT_CACHE["t"] = now
+    return _PORT_CACHE["v"]
+
+
+def _invalidate_port_cache():
+    _PORT_CACHE["t"] = 0.0
+
+
+# numeric token in a TEMP? reply; the rightmost match is the reading
+_FLOAT_RE = re.compile(rb"[-+]?\d+\.?\d*(?:[eE][-+]?\d+)?")
+
+
+def _parse_temperature(raw: bytes) -> Optional[float]:
+    """Return the last numeric token of a raw TEMP? reply (e.g. b'TEMP_C 24.50'), or None."""
+    m = None
+    for m in _FLOAT_RE.finditer(raw):
+        pass
+    return float(m.group()) if m else None
+
+
+def _close_probe_result(fut):
+    """Done-callback for losing auto_connect probes: close any port they opened."""
+    if fut.cancelled():
+        return
+    try:
+        s = fut.result()
+    except Exception:
+        return
+    if s is not None:
+        try:
+            s.close()
+        except Exception:
+            pass
+
+
+class _ZimonProtocol(serial.threaded.LineReader):
+    """
+    Line protocol run by serial.threaded.ReaderThread once a port is attached.
+    Pushed temperature lines ('TEMP <value>') go to on_temperature and never
+    reach inbox, so they cannot be mistaken for a command reply. Other
+    complete lines (stripped bytes) go to inbox; when nobody collects them
+    (fire-and-forget commands, unsolicited messages) the oldest are dropped.
+    """
+    TERMINATOR = b"\n"
+
+    def __init__(self):
+        super().__init__()
+        self.inbox: "queue.Queue[bytes]" = queue.Queue(maxsize=256)
+        # set by ArduinoController._attach(); called on the reader thread
+        self.on_temperature = None
+        self.on_lost = None
+
+    def handle_packet(self, packet: bytes):
+        line = packet.strip()
+        if not line:
+            return
+        if line.startswith(_TEMP_PUSH):
+            temp = _parse_temperature(line)
+            cb = self.on_temperature
+            if temp is not None and cb is not None:
+                cb(temp)
+            return
+        try:
+            self.inbox.put_nowait(line)
+        except queue.Full:
+            try:
+                self.inbox.get_nowait()
+            except queue.Empty:
+                pass
+            self.inbox.put_nowait(line)
+
+    def connection_lost(self, exc):
+        if exc is not None:
+            LOG.warning("Serial reader stopped: %s", exc)
+            cb = self.on_lost
+            if cb is not None:
+                cb()
+        super().connection_lost(exc)
+
 
 class ArduinoController:
     """
@@ -17,13 +138,40 @@ class ArduinoController:
     - close()
     - send(cmd) -> reply str or None
     - read_temperature_c() -> Optional[float]
+
+    Readings pushed by the firmware are kept in last_temperature and passed to
+    temperature_callback(value) on the serial reader thread. An unexpected loss
+    of the port (reader error or failed write) calls disconnect_callback() on
+    the thread that noticed it.
     """
 
-    def __init__(self, port: Optional[str] = None, baudrate: int = 115200, timeout: float = 0.6):
+    # Ports opened at least once in this process. On Windows DTR/RTS can be
+    # held low before open(), so the board is not reset by later opens and
+    # those skip the bootloader wait. POSIX open() asserts DTR (HUPCL) before
+    # pyserial can clear it, so there every open resets the board.
+    _seen_ports = set()
+
+    def __init__(self, port: Optional[str] = None, baudrate: int = 115200, timeout: float = 0.6,
+                 low_latency: bool = True):
         self.port = port
         self.baudrate = baudrate
         self.timeout = timeout
+        self.low_latency = low_latency
         self.ser: Optional[serial.Serial] = None
+        # set by _attach(), cleared by close() and on serial I/O errors
+        self._connected = False
+        # serialises write -> reply pairs between callers (GUI, pollers, runner)
+        self._io_lock = threading.Lock()
+        # pyserial ReaderThread + line protocol, running while a port is attached
+        self._rt: Optional[serial.threaded.ReaderThread] = None
+        self._proto: Optional[_ZimonProtocol] = None
+        # POSIX only: fd of the attached port for direct os.write() (see _write)
+        self._fd: Optional[int] = None
+        # latest firmware-pushed reading and the hooks notified from the reader thread
+        self.last_temperature: Optional[float] = None
+        self._last_temp_ts = 0.0
+        self.temperature_callback = None
+        self.disconnect_callback = None
 
         if self.port:
             try:
@@ -34,20 +182,8 @@ class ArduinoController:
                 LOG.warning("Initial connect attempt raised: %s", e)
 
     def is_connected(self) -> bool:
-        """Check if Arduino is connected. More robust check."""
-        if self.ser is None:
-            return False
-        try:
-            # Check if port is open
-            if not getattr(self.ser, "is_open", False):
-                return False
-            # Additional check: try to get port info
-            port = getattr(self.ser, "port", None)
-            if port:
-                return True
-            return False
-        except Exception:
-            return False
+        """Check if Arduino is connected."""
+        return self._connected and self.ser is not None and self.ser.is_open
 
     # -----------------------
     # low-level connect/open
@@ -58,44 +194,54 @@ class ArduinoController:
         This function never attaches to self.ser; it's only for probing.
         """
         try:
-            # Open with longer timeout for initial connection
-            # If reset_arduino is False, we can try to connect without resetting
-            s = serial.Serial(port, self.baudrate, timeout=1.0)
-            
-            # Arduino resets when DTR toggles (happens on open)
-            # Wait longer for Arduino to boot and send startup messages
-            time.sleep(1.5)  # Give Arduino time to reset and boot
-            
+            # Configure before open() so DTR is not asserted by the open itself
+            s = serial.Serial(port=None)
+            s.baudrate = self.baudrate
+            s.timeout = 0.3
+            s.dsrdtr = False
+            s.dtr = False
+            s.rts = False
+            s.port = port
+            s.open()
+
+            if os.name == "nt" and port in ArduinoController._seen_ports:
+                # already running since an earlier open: only let USB-CDC settle
+                time.sleep(0.05)
+                try:
+                    s.reset_input_buffer()
+                except Exception:
+                    pass
+                return s
+            ArduinoController._seen_ports.add(port)
+
             try:
-                # Clear input buffer first
-                s.reset_input_buffer()
-                # Read and discard all startup messages (ZIMON_MEGA_READY, etc.)
-                deadline = time.time() + 1.0
+                # A freshly reset board stays silent while the bootloader runs;
+                # a running sketch may already be talking. Only wait for boot
+                # when nothing arrives within 200 ms.
+                s.timeout = 0.2
+                first = s.readline()
+                s.timeout = 0.3
+                if not first:
+                    time.sleep(1.0)
+
+                # Read and discard startup messages (ZIMON_MEGA_READY, etc.).
+                # readline() returns as soon as a line is complete or the
+                # port timeout elapses, so there is no polling quantum.
                 startup_lines = []
-                while time.time() < deadline:
-                    try:
-                        if s.in_waiting > 0:
-                            line = s.readline().decode(errors="ignore").strip()
-                            if line:
-                                startup_lines.append(line)
-                                LOG.debug("Startup message from %s: %r", port, line)
-                                # If we see ZIMON_MEGA_READY, Arduino is ready
-                                if "ZIMON_MEGA" in line.upper():
-                                    # Read one more line (the commands list)
-                                    time.sleep(0.1)
-                                    try:
-                                        s.readline()
-                                    except:
-                                        pass
-                                    break
-                            else:
-                                time.sleep(0.05)
-                        else:
-                            time.sleep(0.05)
-                    except Exception as e:
-                        LOG.debug("Error reading startup: %s", e)
+                for _ in range(6):
+                    raw = first or s.readline()
+                    first = b""
+                    line = raw.decode(errors="ignore").strip()
+                    if not line:
                         break
-                
+                    startup_lines.append(line)
+                    LOG.debug("Startup message from %s: %r", port, line)
+                    # If we see ZIMON_MEGA_READY, Arduino is ready
+                    if "ZIMON_MEGA" in line.upper():
+                        # Read one more line (the commands list)
+                        s.readline()
+                        break
+
                 if startup_lines:
                     LOG.debug("Cleared %d startup lines from %s", len(startup_lines), port)
             except Exception as e:
@@ -103,6 +249,7 @@ class ArduinoController:
             return s
         except PermissionError as pe:
             LOG.warning("Permission denied opening %s: %s", port, pe)
+            _invalidate_port_cache()
             return None
         except serial.SerialException as se:
             LOG.debug("SerialException opening %s: %s", port, se)
@@ -122,30 +269,28 @@ class ArduinoController:
                           If False, tries to connect without resetting (for already-running Arduino)
         """
         LOG.info("Opening serial %s @ %d (connect)", port, self.baudrate)
+        if self.ser is not None:
+            # drop a stale attachment (e.g. after an I/O error) before reopening
+            self.close()
+
+        # Open (and wait for boot) once; retries reuse the same handle so the
+        # board is not reset again by a fresh open
+        s = self._open_for_probe(port)
+        if s is None:
+            LOG.error("Failed to open serial %s", port)
+            return False
 
         # try a few times for reliability
         attempts = 3
         for attempt in range(1, attempts + 1):
-            s = self._open_for_probe(port)
-            if s is None:
-                time.sleep(0.05)
-                continue
-
             try:
-                # Make sure buffer is clear
-                s.reset_input_buffer()
-                time.sleep(0.2)
-                
-                # Send PING command
-                s.write(b"PING\n")
+                # _open_for_probe already drained the boot chatter; leftover
+                # banner lines are ignored by the reply matcher below
+                s.write(_CMD_PING)
                 s.flush()
                 LOG.debug("Sent PING to %s", port)
             except Exception as e:
                 LOG.debug("Write during handshake failed on %s: %s", port, e)
-                try:
-                    s.close()
-                except Exception:
-                    pass
                 time.sleep(0.1)
                 continue
 
@@ -176,207 +321,578 @@ class ArduinoController:
                 if has_zimon:
                     LOG.info("Handshake reply from %s: %s", port, reply_lines)
                     # attach serial to controller
-                    self.ser = s
-                    self.port = port
+                    self._attach(s, port)
                     LOG.info("Connected and attached to %s", port)
                     return True
                 else:
                     LOG.debug("Got reply but not ZIMON device: %s", reply_lines)
-            
-            # no valid reply - close and retry
-            try:
-                s.close()
-            except Exception:
-                pass
+
+            # no valid reply - retry PING on the same handle
             LOG.info("No handshake reply on %s (attempt %d/%d)", port, attempt, attempts)
-            time.sleep(0.2)  # Longer delay between attempts
+            if attempt < attempts:
+                # exponential backoff (capped) with jitter to decorrelate from the device
+                time.sleep(min(1.0, 0.05 * (2 ** attempt)) + random.uniform(0, 0.05))
 
+        try:
+            s.close()
+        except Exception:
+            pass
         LOG.error("Failed to open serial %s after %d attempts", port, attempts)
         return False
 
-    def auto_connect(self) -> bool:
+    def _attach(self, s: serial.Serial, port: str):
         """
-        Scan available serial ports and try to attach to the Arduino by sending PING.
-        Returns True if a device was found and attached.
+        Attach an opened, handshaken Serial to the controller.
+        readline() then blocks in the OS until a full line or the timeout.
         """
-        ports = [p.device for p in serial.tools.list_ports.comports()]
-        LOG.info("Auto-detect scanning ports: %s", ports)
+        with self._io_lock:
+            self._attach_locked(s, port)
+
+    def _attach_locked(self, s: serial.Serial, port: str):
+        s.timeout = 1.0
+        s.write_timeout = 1.0
+        if self.low_latency:
+            # after the timeouts: pyserial rewrites COMMTIMEOUTS when they change
+            self._set_low_latency(s)
+        self.ser = s
+        self.port = port
+        self._fd = None
+        if os.name == "posix":
+            try:
+                self._fd = s.fileno()
+            except Exception:
+                pass
+        self._rt = serial.threaded.ReaderThread(s, _ZimonProtocol)
+        self._rt.name = "arduino-rx-%s" % port
+        self._rt.start()
+        self._proto = self._rt.connect()[1]
+        self._proto.on_temperature = self._on_pushed_temperature
+        self._proto.on_lost = self._mark_lost
+        self._connected = True
+
+    def _on_pushed_temperature(self, temp: float):
+        self.last_temperature = temp
+        self._last_temp_ts = time.monotonic()
+        cb = self.temperature_callback
+        if cb is not None:
+            cb(temp)
+
+    def _mark_lost(self):
+        """The link failed (reader thread error or failed write): mark it down and notify."""
+        was_connected = self._connected
+        self._connected = False
+        # likely unplugged: whatever appears under this name next may be a freshly reset board
+        ArduinoController._seen_ports.discard(self.port)
+        cb = self.disconnect_callback
+        if was_connected and cb is not None:
+            cb()
+
+    def _set_low_latency(self, s: serial.Serial):
+        """
+        Ask the OS driver to hand over received bytes immediately.
+        - Windows: ReadIntervalTimeout=MAXDWORD with MAXDWORD multiplier makes
+          ReadFile return as soon as any byte is buffered (still waiting up to
+          the port timeout when nothing is).
+        - Linux: set ASYNC_LOW_LATENCY (disables the FTDI/USB latency timer batching).
+        Failures are logged and ignored; not every driver supports these.
+        """
+        try:
+            if os.name == "nt":
+                from serial import win32
+                timeouts = win32.COMMTIMEOUTS()
+                timeouts.ReadIntervalTimeout = win32.MAXDWORD
+                timeouts.ReadTotalTimeoutMultiplier = win32.MAXDWORD
+                timeouts.ReadTotalTimeoutConstant = int((s.timeout or 0) * 1000)
+                timeouts.WriteTotalTimeoutMultiplier = 0
+                timeouts.WriteTotalTimeoutConstant = int((s.write_timeout or 0) * 1000)
+                if not win32.SetCommTimeouts(s._port_handle, ctypes.byref(timeouts)):
+                    raise OSError("SetCommTimeouts failed")
+            elif sys.platform.startswith("linux"):
+                import fcntl
+                import termios
+                tiocgserial = getattr(termios, "TIOCGSERIAL", 0x541E)
+                tiocsserial = getattr(termios, "TIOCSSERIAL", 0x541F)
+                # struct serial_struct: int type, line; unsigned port; int irq; int flags; ...
+                buf = bytearray(128)
+                fcntl.ioctl(s.fd, tiocgserial, buf)
+                flags = struct.unpack_from("i", buf, 16)[0]
+                struct.pack_into("i", buf, 16, flags | _ASYNC_LOW_LATENCY)
+                fcntl.ioctl(s.fd, tiocsserial, buf)
+            else:
+                return
+            LOG.debug("Low-latency mode enabled on %s", s.port)
+        except Exception as e:
+            LOG.debug("Low-latency mode not available on %s: %s", s.port, e)
 
-        for p in ports:
-            LOG.debug("Probing %s", p)
-            s = self._open_for_probe(p)
-            if s is None:
-                continue
+    def _probe_one(self, p: str) -> Optional[serial.Serial]:
+        """
+        Open port p, send PING and collect replies.
+        Returns the open Serial if the device answered, otherwise None (port closed).
+        """
+        LOG.debug("Probing %s", p)
+        s = self._open_for_probe(p)
+        if s is None:
+            return None
 
+        try:
+            s.reset_input_buffer()
+            time.sleep(0.1)
+        except Exception:
+            pass
+
+        # Send PING command
+        try:
+            s.write(_CMD_PING)
+            s.flush()
+            LOG.debug("Sent PING to probe %s", p)
+        except Exception as e:
+            LOG.debug("Write failed on %s: %s", p, e)
             try:
-                s.reset_input_buffer()
-                time.sleep(0.1)
+                s.close()
             except Exception:
                 pass
+            return None
 
-            # Send PING command
+        # Collect replies - wait longer for response
+        deadline = time.time() + 2.0
+        reply_lines = []
+        while time.time() < deadline:
             try:
-                s.reset_input_buffer()
-                time.sleep(0.2)
-                s.write(b"PING\n")
-                s.flush()
-                LOG.debug("Sent PING to probe %s", p)
+                if s.in_waiting > 0:
+                    line = s.readline().decode(errors="ignore").strip()
+                    if line:
+                        reply_lines.append(line)
+                        LOG.debug("Probe %s got line: %r", p, line)
+                        # Check for ZIMON_OK (PING response) or ZIMON_MEGA_READY (startup)
+                        if "ZIMON_OK" in line.upper() or "ZIMON_MEGA" in line.upper() or "ZEB" in line.upper():
+                            LOG.info("Found ZIMON device on probe %s", p)
+                            break
+                else:
+                    time.sleep(0.05)
             except Exception as e:
-                LOG.debug("Write failed on %s: %s", p, e)
-                try:
-                    s.close()
-                except Exception:
-                    pass
-                continue
+                LOG.debug("Error reading probe reply: %s", e)
+                time.sleep(0.05)
 
-            # Collect replies - wait longer for response
-            deadline = time.time() + 2.0
-            reply_lines = []
-            while time.time() < deadline:
-                try:
-                    if s.in_waiting > 0:
-                        line = s.readline().decode(errors="ignore").strip()
-                        if line:
-                            reply_lines.append(line)
-                            LOG.debug("Probe %s got line: %r", p, line)
-                            # Check for ZIMON_OK (PING response) or ZIMON_MEGA_READY (startup)
-                            if "ZIMON_OK" in line.upper() or "ZIMON_MEGA" in line.upper() or "ZEB" in line.upper():
-                                LOG.info("Found ZIMON device on probe %s", p)
-                                break
-                    else:
-                        time.sleep(0.05)
-                except Exception as e:
-                    LOG.debug("Error reading probe reply: %s", e)
-                    time.sleep(0.05)
+        LOG.info("Probe %s reply: %r", p, reply_lines)
 
-            LOG.info("Probe %s reply: %r", p, reply_lines)
+        # Only a ZIMON board counts; other chatty serial devices are left alone
+        if any("ZIMON_OK" in line.upper() or "ZIMON_MEGA" in line.upper() for line in reply_lines):
+            return s
+        try:
+            s.close()
+        except Exception:
+            pass
+        return None
 
-            if reply_lines:
-                # attach this serial and return success
-                self.ser = s
-                self.port = p
-                LOG.info("Auto-detect found device at %s (reply lines: %s)", p, reply_lines)
-                return True
-            else:
+    def auto_connect(self) -> bool:
+        """
+        Scan available serial ports and try to attach to the Arduino by sending PING.
+        All ports are probed concurrently; the first one to answer is attached.
+        Returns True if a device was found and attached.
+        """
+        if self.ser is not None:
+            self.close()
+        ports = [p.device for p in _cached_comports()]
+        LOG.info("Auto-detect scanning ports: %s", ports)
+        if not ports:
+            LOG.info("Auto-detect found no matching device.")
+            return False
+
+        ex = ThreadPoolExecutor(max_workers=len(ports), thread_name_prefix="arduino-probe")
+        futures = {ex.submit(self._probe_one, p): p for p in ports}
+        winner = None
+        try:
+            for fut in as_completed(futures):
                 try:
-                    s.close()
-                except Exception:
-                    pass
-                continue
+                    s = fut.result()
+                except Exception as e:
+                    LOG.debug("Probe of %s raised: %s", futures[fut], e)
+                    continue
+                if s is not None:
+                    winner = fut
+                    break
+        finally:
+            # Losing probes may still be running; close whatever they open
+            for fut in futures:
+                if fut is not winner:
+                    fut.cancel()
+                    fut.add_done_callback(_close_probe_result)
+            ex.shutdown(wait=False)
+
+        if winner is None:
+            LOG.info("Auto-detect found no matching device.")
+            return False
 
-        LOG.info("Auto-detect found no matching device.")
-        return False
+        p = futures[winner]
+        self._attach(winner.result(), p)
+        LOG.info("Auto-detect found device at %s", p)
+        return True
 
     def close(self):
+        _invalidate_port_cache()
+        # under _io_lock: never tear the port down beneath an in-flight write/read
+        with self._io_lock:
+            self._close_locked()
+
+    def _close_locked(self):
         try:
+            self._connected = False
+            self._fd = None
             if self.ser:
-                try:
-                    self.ser.close()
-                except Exception:
-                    pass
+                rt = self._rt
+                self._rt = None
+                self._proto = None
+                if rt is not None:
+                    # stops the reader thread, then closes the port
+                    rt.close()
+                else:
+                    try:
+                        self.ser.close()
+                    except Exception:
+                        pass
                 self.ser = None
                 LOG.info("Serial closed")
         except Exception as e:
             LOG.warning("Error closing serial: %s", e)
 
+    def _drain_input(self):
+        """
+        Discard replies left over from earlier commands (e.g. sent with
+        read_reply=False) so the next reply read belongs to the next command.
+        """
+        proto = self._proto
+        if proto is None:
+            return
+        try:
+            while True:
+                proto.inbox.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _write(self, payload: bytes):
+        """
+        Write the payload: directly to the fd on POSIX, otherwise (or for the
+        remainder of a short write) through the ReaderThread's locked write().
+        No flush(): on USB-CDC it is a tcdrain() round-trip per command, and
+        replies are read by the reader thread anyway. Use flush() when the
+        bytes must be on the wire (e.g. before close).
+        """
+        fd = self._fd
+        if fd is not None:
+            # one write(2) on the (non-blocking) tty instead of pyserial's select loop;
+            # callers already hold _io_lock, so writes cannot interleave
+            try:
+                n = os.write(fd, payload)
+                if n == len(payload):
+                    return
+                payload = payload[n:]
+            except BlockingIOError:
+                pass
+        if self._rt is not None:
+            self._rt.write(payload)
+        else:
+            self.ser.write(payload)
+
+    def flush(self):
+        """Block until everything written so far has been transmitted."""
+        ser = self.ser
+        if ser is None:
+            return
+        try:
+            ser.flush()
+        except Exception as e:
+            LOG.debug("flush failed: %s", e)
+
+    def _read_reply(self, timeout: float = 1.0) -> bytes:
+        """Wait for the next line from the reader thread; b'' on timeout."""
+        proto = self._proto
+        if proto is None:
+            return b""
+        try:
+            return proto.inbox.get(timeout=timeout)
+        except queue.Empty:
+            return b""
+
     def send(self, cmd: str, read_reply: bool = True) -> Optional[str]:
         """
         Send a command string (without trailing newline) and optionally read a single-line reply.
         Returns the reply string (stripped) or None on failure / no reply.
         """
-        if not self.is_connected():
+        return self.send_bytes((cmd.strip() + "\n").encode("utf-8"), read_reply)
+
+    def send_bytes(self, payload: bytes, read_reply: bool = True) -> Optional[str]:
+        """
+        Like send(), but takes an already encoded, newline-terminated payload
+        (e.g. _CMD_PING) so fixed commands skip the str -> bytes round-trip.
+        """
+        if not self._connected:
             LOG.warning("send() called but serial is not open")
             return None
 
-        payload = (cmd.strip() + "\n").encode("utf-8")
+        with self._io_lock:
+            # Discard stale replies before sending
+            self._drain_input()
 
-        try:
-            # Clear input buffer before sending
-            self.ser.reset_input_buffer()
-        except Exception:
-            pass
+            try:
+                self._write(payload)
+            except Exception as e:
+                LOG.warning("Failed to write to serial: %s", e)
+                self._mark_lost()
+                return None
+
+            if not read_reply:
+                return None
+
+            reply = self._read_reply().decode(errors="ignore")
+        if reply:
+            LOG.debug("send(%r) reply=%r", payload, reply)
+            return reply
+        LOG.debug("send(%r) no reply", payload)
+        return None
 
-        try:
-            self.ser.write(payload)
-            self.ser.flush()
-        except Exception as e:
-            LOG.warning("Failed to write to serial: %s", e)
+    def read_temperature_c(self) -> Optional[float]:
+        """
+        Ask the device for temperature with 'TEMP?' command.
+        Returns float Celsius or None.
+        A reading (pushed or read) from the last _TEMP_TTL seconds is returned as is:
+        the DS18B20 converts far slower than callers may poll.
+        """
+        if not self._connected:
             return None
 
-        if not read_reply:
+        if time.monotonic() - self._last_temp_ts < _TEMP_TTL:
+            return self.last_temperature
+
+        with self._io_lock:
+            self._drain_input()
+
+            try:
+                self._write(_CMD_TEMP)
+            except Exception as e:
+                LOG.warning("TEMP? write failed: %s", e)
+                self._mark_lost()
+                return None
+
+            raw = self._read_reply()
+        if not raw:
             return None
 
+        LOG.debug("TEMP? raw reply: %r", raw)
+        temp = _parse_temperature(raw)
+        if temp is not None:
+            self.last_temperature = temp
+            self._last_temp_ts = time.monotonic()
+        return temp
+
+
+class AsyncArduinoController:
+    """
+    asyncio counterpart of ArduinoController, built on pyserial-asyncio.
+    Lets asyncio-based backend code talk to the Arduino without blocking a thread.
+    ArduinoController remains the synchronous API for existing callers.
+    - await connect(port) -> bool
+    - await auto_connect() -> bool
+    - await close()
+    - await send(cmd) -> reply str or None
+    - await read_temperature_c() -> Optional[float]
+
+    Firmware-pushed 'TEMP <value>' lines are never returned as replies; the
+    latest one is kept in last_temperature.
+    """
+
+    def __init__(self, baudrate: int = 115200, timeout: float = 1.0):
+        if not SERIAL_ASYNCIO_AVAILABLE:
+            raise ImportError("pyserial-asyncio is required for AsyncArduinoController. "
+                              "Install with: pip install pyserial-asyncio")
+        self.port: Optional[str] = None
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+        self.last_temperature: Optional[float] = None
+        # replies still owed for commands whose reply was not read
+        self._unanswered = 0
+
+    def is_connected(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing()
+
+    async def _readline(self, reader: asyncio.StreamReader, timeout: float) -> str:
         try:
-            # Wait for reply with timeout
-            deadline = time.time() + 1.0
-            reply = None
-            while time.time() < deadline:
-                if self.ser.in_waiting > 0:
-                    reply = self.ser.readline().decode(errors="ignore").strip()
-                    if reply:
-                        LOG.debug("send(%s) reply=%r", cmd, reply)
-                        return reply
-                else:
-                    time.sleep(0.01)
-            
-            # If no reply, try one more read
-            if reply is None:
-                try:
-                    reply = self.ser.readline().decode(errors="ignore").strip()
-                    if reply:
-                        LOG.debug("send(%s) reply=%r (late)", cmd, reply)
-                        return reply
-                except:
-                    pass
-            
-            LOG.debug("send(%s) no reply", cmd)
-            return None
-        except Exception as e:
-            LOG.warning("Failed reading reply: %s", e)
-            return None
+            raw = await asyncio.wait_for(reader.readline(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return ""
+        return raw.decode(errors="ignore").strip()
+
+    def _take_pushed(self, line: str) -> bool:
+        """Store a pushed temperature line; True if line was one."""
+        if not line.startswith(_TEMP_PUSH.decode()):
+            return False
+        temp = _parse_temperature(line.encode())
+        if temp is not None:
+            self.last_temperature = temp
+        return True
 
-    def read_temperature_c(self) -> Optional[float]:
+    async def _drain_input(self):
         """
-        Ask the device for temperature with 'TEMP?' command.
-        Returns float Celsius or None.
+        Consume the replies still owed for earlier commands (sent with
+        read_reply=False, or whose reply timed out) so the next reply belongs
+        to the next command. The firmware answers every command with one line.
         """
-        if not self.is_connected():
+        while self._unanswered:
+            if not await self._read_reply(self.timeout):
+                # board went quiet; stop waiting for replies that are not coming
+                self._unanswered = 0
+                break
+            self._unanswered -= 1
+
+    async def _read_reply(self, timeout: float) -> str:
+        """Next line that is not a pushed reading; "" on timeout."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            line = await self._readline(self.reader, max(0.0, deadline - loop.time()))
+            if not line or not self._take_pushed(line):
+                return line
+
+    async def _probe(self, port: str):
+        """
+        Open port, skip the boot banner and PING.
+        Returns (reader, writer) if a ZIMON device answered, otherwise None.
+        """
+        try:
+            reader, writer = await serial_asyncio.open_serial_connection(url=port, baudrate=self.baudrate)
+        except (serial.SerialException, OSError) as e:
+            LOG.debug("Async open of %s failed: %s", port, e)
             return None
 
+        # finally: also closes the port when auto_connect cancels a losing probe
+        # (CancelledError is not an Exception)
+        handed_over = False
         try:
-            self.ser.reset_input_buffer()
-        except Exception:
-            pass
+            # Same boot detection as the sync probe: silent port -> board is resetting
+            line = await self._readline(reader, 0.2)
+            if not line:
+                await asyncio.sleep(1.0)
+            for _ in range(6):
+                if line and "ZIMON_MEGA" in line.upper():
+                    await self._readline(reader, 0.3)
+                    break
+                line = await self._readline(reader, 0.3)
+                if not line:
+                    break
+
+            writer.write(_CMD_PING)
+            await writer.drain()
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + 2.0
+            while loop.time() < deadline:
+                line = await self._readline(reader, deadline - loop.time())
+                if not line:
+                    continue
+                LOG.debug("Async handshake reply from %s: %r", port, line)
+                if "ZIMON_OK" in line.upper() or "ZIMON_MEGA" in line.upper():
+                    handed_over = True
+                    return reader, writer
+        except Exception as e:
+            LOG.debug("Async handshake on %s failed: %s", port, e)
+        finally:
+            if not handed_over:
+                writer.close()
+        return None
+
+    def _attach(self, pair, port: str):
+        self.reader, self.writer = pair
+        self.port = port
+        self._unanswered = 0
+        LOG.info("Connected and attached to %s (async)", port)
+
+    async def connect(self, port: str) -> bool:
+        pair = await self._probe(port)
+        if pair is None:
+            LOG.error("Failed to open serial %s (async)", port)
+            return False
+        self._attach(pair, port)
+        return True
 
+    async def auto_connect(self) -> bool:
+        """
+        Probe all serial ports concurrently and attach to the first ZIMON device.
+        Returns True if a device was found and attached.
+        """
+        ports = [p.device for p in _cached_comports()]
+        LOG.info("Async auto-detect scanning ports: %s", ports)
+        tasks = {asyncio.ensure_future(self._probe(p)): p for p in ports}
+        pending = set(tasks)
+        winner = None
         try:
-            self.ser.write(b"TEMP?\n")
-            self.ser.flush()
-        except Exception as e:
-            LOG.warning("TEMP? write failed: %s", e)
-            return None
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    if winner is None and not t.exception() and t.result() is not None:
+                        winner = t
+        finally:
+            for t in pending:
+                t.cancel()
+            # Close ports opened by every probe except the winner
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for t, res in zip(tasks, results):
+                if t is not winner and isinstance(res, tuple):
+                    res[1].close()
+
+        if winner is None:
+            LOG.info("Async auto-detect found no matching device.")
+            return False
+        self._attach(winner.result(), tasks[winner])
+        return True
 
-        # read up to 1 second, collect the first line with a float token
-        deadline = time.time() + 1.0
-        reply = None
-        while time.time() < deadline:
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
             try:
-                line = self.ser.readline().decode(errors="ignore").strip()
+                await self.writer.wait_closed()
             except Exception:
-                line = ""
-            if line:
-                reply = line
-                break
-            time.sleep(0.02)
+                pass
+            LOG.info("Serial closed (async)")
+        self.reader = None
+        self.writer = None
 
-        if not reply:
+    async def send(self, cmd: str, read_reply: bool = True) -> Optional[str]:
+        """
+        Send a command string (without trailing newline) and optionally await a single-line reply.
+        Returns the reply string (stripped) or None on failure / no reply.
+        """
+        if not self.is_connected():
+            LOG.warning("send() called but serial is not open")
             return None
 
-        LOG.debug("TEMP? raw reply: %r", reply)
-        # parse numeric token
-        parts = reply.split()
-        for tok in reversed(parts):
+        async with self._lock:
+            # Discard stale replies before sending
+            await self._drain_input()
             try:
-                return float(tok)
-            except Exception:
-                continue
-        return None
+                self.writer.write((cmd.strip() + "\n").encode("utf-8"))
+                await self.writer.drain()
+            except Exception as e:
+                LOG.warning("Failed to write to serial: %s", e)
+                return None
+
+            if not read_reply:
+                self._unanswered += 1
+                return None
+
+            reply = await self._read_reply(self.timeout)
+            if not reply:
+                self._unanswered += 1
+            LOG.debug("send(%s) reply=%r", cmd, reply)
+            return reply or None
+
+    async def read_temperature_c(self) -> Optional[float]:
+        """
+        Ask the device for temperature with 'TEMP?' command.
+        Returns float Celsius or None.
+        """
+        reply = await self.send("TEMP?")
+        if not reply:
+            return None
+        return _parse_temperature(reply.encode())
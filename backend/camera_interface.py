@@ -2,7 +2,7 @@
 import logging
 import threading
 import time
-from typing import List
+from typing import Iterable, Tuple
 
 logger = logging.getLogger("CameraController")
 
@@ -15,12 +15,18 @@ class CameraController:
     def __init__(self):
         # simple placeholder state
         self.cameras = ["top", "side"]  # assume two cameras by default
+        self._cameras_snapshot: Tuple[str, ...] = tuple(self.cameras)
         self.recording = {}
-        self._lock = threading.Lock()
 
-    def list_cameras(self) -> List[str]:
+    def list_cameras(self) -> Tuple[str, ...]:
         # In real code query connected devices
-        return list(self.cameras)
+        # immutable snapshot, so callers can't alter our list (copy it if you need to)
+        return self._cameras_snapshot
+
+    def set_cameras(self, names: Iterable[str]):
+        """Replace the camera set (e.g. after a hot-plug) and rebuild the snapshot."""
+        self.cameras = list(names)
+        self._cameras_snapshot = tuple(self.cameras)
 
     def start_recording(self, camera_name: str, filename: str, duration_s: int=None):
         """
@@ -28,31 +34,34 @@ class CameraController:
         Returns a token/handle that can be used to stop.
         """
         logger.info(f"Start recording camera={camera_name} -> {filename}")
-        with self._lock:
-            if camera_name in self.recording:
-                logger.warning("Camera already recording")
-                return None
-            stop_flag = {"stop": False}
-            self.recording[camera_name] = stop_flag
-
-            def _simulate():
-                logger.info(f"[{camera_name}] recording started (simulated)")
-                t0 = time.time()
-                while not stop_flag["stop"]:
-                    time.sleep(0.2)
-                    if duration_s and (time.time() - t0) > duration_s:
-                        break
-                logger.info(f"[{camera_name}] recording stopped (simulated)")
-                with self._lock:
-                    self.recording.pop(camera_name, None)
-
-            threading.Thread(target=_simulate, daemon=True).start()
-            return stop_flag
+        # dict.setdefault/pop are atomic under the GIL, so no lock is needed
+        stop_evt = threading.Event()
+        existing = self.recording.setdefault(camera_name, stop_evt)
+        if existing is not stop_evt:
+            logger.warning("Camera already recording")
+            return None
+
+        def _simulate():
+            logger.info(f"[{camera_name}] recording started (simulated)")
+            deadline = time.monotonic() + duration_s if duration_s else None
+            while True:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                # sleeps until stop_recording() sets the event or the duration elapses
+                if stop_evt.wait(timeout=remaining):
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+            logger.info(f"[{camera_name}] recording stopped (simulated)")
+            # only drop our own entry; a new recording may already have replaced it
+            if self.recording.get(camera_name) is stop_evt:
+                self.recording.pop(camera_name, None)
+
+        threading.Thread(target=_simulate, daemon=True).start()
+        return stop_evt
 
     def stop_recording(self, camera_name: str):
-        with self._lock:
-            flag = self.recording.get(camera_name)
-            if flag:
-                flag["stop"] = True
-                return True
-            return False
+        evt = self.recording.pop(camera_name, None)
+        if evt:
+            evt.set()
+            return True
+        return False
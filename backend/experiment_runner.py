@@ -14,10 +14,33 @@ and camera_controller as a separate argument.
 
 Save this file as backend/experiment_runner.py (overwrite existing).
 """
+import heapq
+import os
+import queue
+import selectors
 import threading
 import time
 import json
-from typing import Dict, Any, Optional, Callable, List
+import logging
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Callable, List, Tuple
+
+# Levels are 0..255, so every level command can be encoded once up front
+_CMD_TABLE = {name: [f"{name} {i}\n".encode("ascii") for i in range(256)]
+              for name in ("IR", "WHITE", "VIB", "PUMP", "HEATER")}
+_IR_CMDS = _CMD_TABLE["IR"]
+_WHITE_CMDS = _CMD_TABLE["WHITE"]
+_VIB_CMDS = _CMD_TABLE["VIB"]
+_PUMP_CMDS = _CMD_TABLE["PUMP"]
+_HEATER_CMDS = _CMD_TABLE["HEATER"]
+_BUZZER_ON = b"BUZZER ON\n"
+_BUZZER_OFF = b"BUZZER OFF\n"
+_RGB_OFF = b"RGB 0 0 0\n"
+
+
+def _clamp8(v) -> int:
+    v = int(v)
+    return 0 if v < 0 else 255 if v > 255 else v
 
 
 class ExperimentRunner:
@@ -30,7 +53,7 @@ class ExperimentRunner:
         - app: main application object (optional). If provided, runner will prefer app.arduino.
         - camera_controller: optional controller exposing start_recording(camera_list, prefix) and stop_recording()
         - storage_manager: optional (not used heavily here)
-        - logger: optional callable for logs (e.g., app.append_log)
+        - logger: optional callable for logs (e.g., app.append_log) or a logging.Logger
         - arduino_controller: optional direct Arduino controller (fallback if app.arduino missing)
         """
         self.app = app
@@ -38,21 +61,70 @@ class ExperimentRunner:
         self.storage_manager = storage_manager
         self.arduino_controller = arduino_controller
         # prefer explicit logger, then app.append_log, then print
-        if logger:
+        self._logger: Optional[logging.Logger] = None
+        if isinstance(logger, logging.Logger):
+            self._logger = logger
+            self._log = logger.info
+        elif logger:
             self._log = logger
         else:
             self._log = (getattr(app, "append_log", print) if app else print)
 
         self._thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
-        self._running_lock = threading.Lock()
-        self._is_running = False
-        self._active_timers: List[threading.Timer] = []
+        # set while a run is active
+        self._running_event = threading.Event()
+        # one token per run; whichever of stop() / end of run pops it does the cleanup
+        # (list.pop is atomic, so no lock is needed - see _cleanup)
+        self._cleanup_token: List[bool] = []
+        # stimulus plan compiled by start(): (offset_s, encoded payload), in schedule order
+        self._plan: List[Tuple[float, bytes]] = []
+        # single scheduler thread: min-heap of (deadline, seq, payload), woken via _sched_cv
+        self._sched_heap: List[tuple] = []
+        self._sched_cv = threading.Condition()
+        self._sched_base = 0.0
+        self._sched_thread: Optional[threading.Thread] = None
+        # run generation: bumped by start()/stop(); callbacks from an older generation are ignored
+        self._gen = 0
+        # raw-serial fallback only: replies read off the hot path as (monotonic_ts, line)
+        self._reply_q: "queue.Queue[tuple]" = queue.Queue(maxsize=256)
+        self._reader_thread: Optional[threading.Thread] = None
+        # controller resolved once per run (see _resolve_arduino)
+        self._ar = None
+        self._send_bytes_fn: Optional[Callable] = None
+        self._send_fn: Optional[Callable] = None
+        # camera start/stop run on their own worker so they never delay the run thread
+        self._cam_q: "queue.Queue[tuple]" = queue.Queue()
+        self._cam_thread: Optional[threading.Thread] = None
+        # serial outbox: payloads queued by the scheduler, written by _writer_loop
+        self._outbox: "queue.SimpleQueue[Optional[bytes]]" = queue.SimpleQueue()
+        self._writer_thread: Optional[threading.Thread] = None
+        # per-thread command batch (list while inside _command_batch(), else None)
+        self._batch = threading.local()
+        # stimulus name -> plan handler(params, plan)
+        self._stim_handlers: Dict[str, Callable] = {
+            "IR": self._sched_ir,
+            "WHITE": self._sched_white,
+            "VIB": self._sched_vib,
+            "PUMP": self._sched_pump,
+            "RGB": self._sched_rgb,
+            "BUZZER": self._sched_buzzer,
+            "HEATER": self._sched_heater,
+        }
 
         self.log("ExperimentRunner initialized (arduino_controller provided={})".format(bool(self.arduino_controller)))
 
-    def log(self, *args):
+    def _log_enabled(self, level: int) -> bool:
+        """False only when a logging.Logger is in use and would discard `level`."""
+        return self._logger is None or self._logger.isEnabledFor(level)
+
+    def log(self, *args, level: int = logging.INFO):
+        # args are only stringified when the message will actually be emitted
         try:
+            if self._logger is not None:
+                if self._logger.isEnabledFor(level):
+                    self._logger.log(level, " ".join(map(str, args)))
+                return
             self._log(" ".join(map(str, args)))
         except Exception:
             print(*args)
@@ -63,14 +135,35 @@ class ExperimentRunner:
     def start(self, cfg: Dict[str, Any]):
         """Start an experiment with the given configuration.
         If a run is already active, logs and returns False."""
-        with self._running_lock:
-            if self._is_running:
-                self.log("ExperimentRunner: already running")
-                return False
-            self._is_running = True
-            self._stop_event.clear()
-
-        self.log("ExperimentRunner: starting with cfg:", json.dumps(cfg))
+        if self._running_event.is_set():
+            self.log("ExperimentRunner: already running")
+            return False
+        self._running_event.set()
+        self._cleanup_token[:] = [True]
+        self._stop_event.clear()
+
+        if self._log_enabled(logging.DEBUG):
+            self.log("ExperimentRunner: starting with cfg:", json.dumps(cfg, separators=(",", ":")),
+                     level=logging.DEBUG)
+        self._resolve_arduino()
+        # compile the whole stimulus schedule up front (cfg is not referenced afterwards)
+        self._plan = self._compile_plan(cfg.get("stimuli", {}) or {})
+        with self._sched_cv:
+            self._sched_heap.clear()
+            self._gen += 1
+        self._sched_thread = threading.Thread(target=self._scheduler_loop, args=(self._gen,),
+                                              daemon=True, name="experiment-scheduler")
+        self._sched_thread.start()
+        # drop anything left behind by a previous run's writer
+        while True:
+            try:
+                self._outbox.get_nowait()
+            except queue.Empty:
+                break
+        self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True,
+                                               name="experiment-serial-writer")
+        self._writer_thread.start()
+        self._start_reply_reader()
         self._thread = threading.Thread(target=self._run_thread, args=(cfg,), daemon=True)
         self._thread.start()
         return True
@@ -79,34 +172,18 @@ class ExperimentRunner:
         """Request a stop. Cancels timers, turns off actuators, stops camera recording."""
         self.log("ExperimentRunner: stop requested")
         self._stop_event.set()
+        self._gen += 1
 
-        # cancel timers
-        for t in list(self._active_timers):
-            try:
-                t.cancel()
-            except Exception:
-                pass
-        self._active_timers.clear()
-
-        # attempt to turn off all outputs
-        try:
-            self._cmd_off_all()
-        except Exception as e:
-            self.log("ExperimentRunner: error turning off stimuli:", e)
-
-        # stop camera
-        try:
-            if self.camera_controller and hasattr(self.camera_controller, "stop_recording"):
-                self.camera_controller.stop_recording()
-        except Exception as e:
-            self.log("ExperimentRunner: error stopping camera recording:", e)
+        # outputs off + camera stop, unless the run thread already did it
+        self._cleanup()
+        # re-resolve the controller on next use, in case it was swapped
+        self._ar = None
 
         # join thread briefly
         if self._thread and self._thread.is_alive():
             self._thread.join(timeout=1.0)
 
-        with self._running_lock:
-            self._is_running = False
+        self._running_event.clear()
 
         self.log("ExperimentRunner: stopped")
         return True
@@ -116,7 +193,9 @@ class ExperimentRunner:
     # -------------------------
     def _run_thread(self, cfg: Dict[str, Any]):
         try:
-            start_time = time.time()
+            # monotonic clock: immune to NTP/wall-clock steps during a run
+            start_time = time.monotonic()
+            self._sched_base = start_time
             duration_s = int(cfg.get("duration_s", 0) or 0)
             if duration_s <= 0:
                 self.log("ExperimentRunner: warning - duration_s <= 0")
@@ -124,262 +203,288 @@ class ExperimentRunner:
             # Start camera recording if available
             cameras = cfg.get("camera_list", []) or []
             prefix = cfg.get("filename_prefix", "exp")
-            try:
-                if self.camera_controller and hasattr(self.camera_controller, "start_recording"):
-                    self.log("ExperimentRunner: starting recording for cameras:", cameras, "prefix:", prefix)
-                    self.camera_controller.start_recording(cameras, prefix)
-                else:
-                    self.log("ExperimentRunner: no camera_controller.start_recording available")
-            except Exception as e:
-                self.log("ExperimentRunner: camera start_recording error:", e)
+            if self.camera_controller and hasattr(self.camera_controller, "start_recording"):
+                self.log("ExperimentRunner: starting recording for cameras:", cameras, "prefix:", prefix)
+                self._cam_submit("start_recording", cameras, prefix)
+            else:
+                self.log("ExperimentRunner: no camera_controller.start_recording available")
 
             # Schedule stimuli
-            stimuli = cfg.get("stimuli", {}) or {}
-            self._schedule_stimuli(stimuli, base_time=start_time)
+            self._load_plan(self._plan, start_time)
 
-            # Wait until duration or stop
+            # Wait until duration or stop (woken immediately by stop())
             if duration_s > 0:
                 end_time = start_time + duration_s
-                while not self._stop_event.is_set() and time.time() < end_time:
-                    time.sleep(0.1)
+                while not self._stop_event.wait(timeout=max(0.0, end_time - time.monotonic())):
+                    if time.monotonic() >= end_time:
+                        break
             else:
-                while not self._stop_event.is_set():
-                    time.sleep(0.2)
+                self._stop_event.wait()
 
             # cleanup
             self.log("ExperimentRunner: experiment finished/stop; cleaning up")
-            self._cmd_off_all()
-            try:
-                if self.camera_controller and hasattr(self.camera_controller, "stop_recording"):
-                    self.camera_controller.stop_recording()
-            except Exception as e:
-                self.log("ExperimentRunner: camera stop_recording error:", e)
+            self._cleanup()
 
         except Exception as e:
             self.log("ExperimentRunner: unexpected error in _run_thread:", e)
         finally:
-            for t in list(self._active_timers):
-                try:
-                    t.cancel()
-                except Exception:
-                    pass
-            self._active_timers.clear()
-            with self._running_lock:
-                self._is_running = False
+            self._cleanup()
+            self._running_event.clear()
+
+    def _cleanup(self):
+        """
+        End-of-run cleanup, executed once per run by whichever of stop() and
+        the run thread gets here first: stop the scheduler, switch all outputs
+        off (one batched write) and stop camera recording.
+        """
+        try:
+            self._cleanup_token.pop()
+        except IndexError:
+            return
+
+        # no further stimulus edges may fire after the outputs are switched off
+        self._stop_event.set()
+        self._stop_scheduler()
+        # queued edges go out first; the off-all below is then written directly
+        self._stop_writer()
+        try:
+            self._cmd_off_all()
+        except Exception as e:
+            self.log("ExperimentRunner: error turning off stimuli:", e)
+        if self.camera_controller and hasattr(self.camera_controller, "stop_recording"):
+            self._cam_submit("stop_recording")
+
+    def _cam_submit(self, method: str, *args):
+        """Queue a camera_controller call for the camera worker thread (started on first use)."""
+        self._cam_q.put((method, args))
+        if self._cam_thread is None or not self._cam_thread.is_alive():
+            self._cam_thread = threading.Thread(target=self._cam_worker, daemon=True,
+                                                name="experiment-camera")
+            self._cam_thread.start()
+
+    def _cam_worker(self):
+        while True:
+            method, args = self._cam_q.get()
+            try:
+                getattr(self.camera_controller, method)(*args)
+            except Exception as e:
+                self.log(f"ExperimentRunner: camera {method} error:", e)
+            finally:
+                self._cam_q.task_done()
 
     # -------------------------
     # Scheduling
     # -------------------------
-    def _schedule_stimuli(self, stimuli: Dict[str, Any], base_time: float):
+    def _compile_plan(self, stimuli: Dict[str, Any]) -> List[Tuple[float, bytes]]:
+        """
+        Turn the stimuli config into a flat list of (offset_s, encoded payload)
+        edges relative to the experiment start; the run thread hands it to the
+        scheduler in one go.
+        """
+        plan: List[Tuple[float, bytes]] = []
+        handlers = self._stim_handlers
         for name, params in stimuli.items():
             if params is None:
                 continue
-            name_u = name.upper()
-            delay_ms = int(params.get("delay_ms", params.get("delay", 0) or 0))
-            duration_ms = int(params.get("duration_ms", params.get("duration", 0) or 0))
-            level = params.get("level", params.get("lvl", None))
-
-            if name_u == "IR":
-                level = int(params.get("level", 255))
-                self._schedule_cmd_at(delay_ms, lambda lv=level: self._cmd_ir_set(lv))
-                if duration_ms > 0:
-                    self._schedule_cmd_at(delay_ms + duration_ms, lambda: self._cmd_ir_set(0))
-                self.log("Scheduled IR:", delay_ms, "ms ->", duration_ms, "ms at level", level)
-
-            elif name_u == "WHITE":
-                level = int(params.get("level", 255))
-                self._schedule_cmd_at(delay_ms, lambda lv=level: self._cmd_white_set(lv))
-                if duration_ms > 0:
-                    self._schedule_cmd_at(delay_ms + duration_ms, lambda: self._cmd_white_set(0))
-                self.log("Scheduled WHITE:", delay_ms, "ms ->", duration_ms, "ms at level", level)
-
-            elif name_u == "VIB":
-                level = int(params.get("level", 200))
-                continuous = params.get("continuous", False)
-                delay_ms = int(params.get("delay_ms", 0))
-                duration_ms = int(params.get("duration_ms", 0))
-                
-                if continuous:
-                    # Continuous mode: turn on immediately and keep on
-                    self._schedule_cmd_at(0, lambda lv=level: self._cmd_vib_set(lv))
-                    self.log("Scheduled VIB: Continuous at level", level)
-                elif duration_ms > 0:
-                    # Pulsed mode: duration -> delay -> duration -> delay...
-                    self._schedule_repeating_stimulus(
-                        "VIB", level, delay_ms, duration_ms, base_time
-                    )
-                    self.log("Scheduled VIB: Repeating pattern, duration", duration_ms, "ms, delay", delay_ms, "ms at level", level)
-                else:
-                    # Single pulse
-                    self._schedule_cmd_at(delay_ms, lambda lv=level: self._cmd_vib_set(lv))
-                    self.log("Scheduled VIB: Single pulse at", delay_ms, "ms, level", level)
-
-            elif name_u == "PUMP":
-                if level is not None:
-                    self._schedule_cmd_at(delay_ms, lambda lv=level: self._cmd_pump_set(lv))
-                    if duration_ms > 0:
-                        self._schedule_cmd_at(delay_ms + duration_ms, lambda: self._cmd_pump_set(0))
-                    self.log("Scheduled PUMP:", delay_ms, "ms ->", duration_ms, "ms at level", level)
-
-            elif name_u == "RGB":
-                r = int(params.get("r", 0))
-                g = int(params.get("g", 0))
-                b = int(params.get("b", 0))
-                self._schedule_cmd_at(delay_ms, lambda rr=r, gg=g, bb=b: self._cmd_rgb_set(rr, gg, bb))
-                if duration_ms > 0:
-                    self._schedule_cmd_at(delay_ms + duration_ms, lambda: self._cmd_rgb_set(0, 0, 0))
-                self.log("Scheduled RGB:", r, g, b, "delay", delay_ms, "dur", duration_ms)
-
-            elif name_u == "BUZZER":
-                continuous = params.get("continuous", False)
-                delay_ms = int(params.get("delay_ms", 0))
-                duration_ms = int(params.get("duration_ms", 0))
-                level = int(params.get("level", 200))
-                
-                if continuous:
-                    # Continuous mode: turn on immediately and keep on
-                    self._schedule_cmd_at(0, self._cmd_buzzer_on)
-                    self.log("Scheduled BUZZER: Continuous")
-                elif duration_ms > 0:
-                    # Pulsed mode: duration -> delay -> duration -> delay...
-                    self._schedule_repeating_stimulus(
-                        "BUZZER", level, delay_ms, duration_ms, base_time
-                    )
-                    self.log("Scheduled BUZZER: Repeating pattern, duration", duration_ms, "ms, delay", delay_ms, "ms")
-                else:
-                    # Single pulse
-                    self._schedule_cmd_at(delay_ms, self._cmd_buzzer_on)
-                    if duration_ms > 0:
-                        self._schedule_cmd_at(delay_ms + duration_ms, self._cmd_buzzer_off)
-                    self.log("Scheduled BUZZER: Single pulse at", delay_ms, "ms")
-
-            elif name_u == "HEATER":
-                level = int(params.get("level", 200))
-                continuous = params.get("continuous", False)
-                delay_ms = int(params.get("delay_ms", 0))
-                duration_ms = int(params.get("duration_ms", 0))
-                
-                if continuous:
-                    # Continuous mode: turn on immediately and keep on
-                    self._schedule_cmd_at(0, lambda lv=level: self._cmd_heater_set(lv))
-                    self.log("Scheduled HEATER: Continuous at level", level)
-                elif duration_ms > 0:
-                    # Pulsed mode: duration -> delay -> duration -> delay...
-                    self._schedule_repeating_stimulus(
-                        "HEATER", level, delay_ms, duration_ms, base_time
-                    )
-                    self.log("Scheduled HEATER: Repeating pattern, duration", duration_ms, "ms, delay", delay_ms, "ms at level", level)
-                else:
-                    # Single pulse
-                    self._schedule_cmd_at(delay_ms, lambda lv=level: self._cmd_heater_set(lv))
-                    self.log("Scheduled HEATER: Single pulse at", delay_ms, "ms, level", level)
-
-            else:
+            handler = handlers.get(name.upper())
+            if handler is None:
                 self.log("ExperimentRunner: unknown stimulus:", name)
+                continue
+            handler(params, plan)
+        return plan
 
-    def _schedule_cmd_at(self, delay_ms: int, fn: Callable):
-        if self._stop_event.is_set():
-            return
-        t = threading.Timer(delay_ms / 1000.0, self._timed_fn_wrapper, args=(fn,))
-        t.daemon = True
-        t.start()
-        self._active_timers.append(t)
-    
-    def _schedule_repeating_stimulus(self, stimulus_name: str, level: int, 
-                                     delay_ms: int, duration_ms: int, base_time: float):
+    @staticmethod
+    def _parse_common(params: Dict[str, Any], default_level: Optional[int] = None):
         """
-        Schedule a repeating stimulus pattern: ON for duration_ms, OFF for delay_ms, repeat.
+        Return (delay_ms, duration_ms, level, continuous) from a stimulus dict.
+        level is clamped to 0..255 here, once; it is None if absent and no default is given.
+        """
+        get = params.get
+        delay = get("delay_ms")
+        if delay is None:
+            delay = get("delay")
+        duration = get("duration_ms")
+        if duration is None:
+            duration = get("duration")
+        level = get("level")
+        if level is None:
+            level = get("lvl")
+        if level is None:
+            level = default_level
+        if level is not None:
+            level = _clamp8(level)
+        return int(delay or 0), int(duration or 0), level, bool(get("continuous", False))
+
+    @staticmethod
+    def _plan_on_off(plan: list, on: bytes, off: bytes, delay_ms: int, duration_ms: int):
+        """ON at delay_ms; OFF at delay_ms + duration_ms when a duration is given."""
+        plan.append((delay_ms / 1000.0, on))
+        if duration_ms > 0:
+            plan.append(((delay_ms + duration_ms) / 1000.0, off))
+
+    @staticmethod
+    def _plan_repeating(plan: list, on: bytes, off: bytes, delay_ms: int, duration_ms: int):
+        """
+        Repeating stimulus pattern: ON for duration_ms, OFF for delay_ms, repeat.
         Pattern: ON (duration) -> OFF (delay) -> ON (duration) -> OFF (delay) -> ...
         """
         if duration_ms <= 0:
             return
-        
         cycle_time = duration_ms + delay_ms  # Total time for one cycle
-        
-        def schedule_cycle(cycle_start_ms: int):
-            """Schedule a single cycle, then schedule the next one"""
-            if self._stop_event.is_set():
-                return
-            
-            # Turn ON at cycle start
-            if stimulus_name == "VIB":
-                self._schedule_cmd_at(cycle_start_ms, lambda: self._cmd_vib_set(level))
-            elif stimulus_name == "BUZZER":
-                self._schedule_cmd_at(cycle_start_ms, self._cmd_buzzer_on)
-            elif stimulus_name == "HEATER":
-                self._schedule_cmd_at(cycle_start_ms, lambda: self._cmd_heater_set(level))
-            
-            # Turn OFF after duration
-            turn_off_ms = cycle_start_ms + duration_ms
-            if stimulus_name == "VIB":
-                self._schedule_cmd_at(turn_off_ms, lambda: self._cmd_vib_set(0))
-            elif stimulus_name == "BUZZER":
-                self._schedule_cmd_at(turn_off_ms, self._cmd_buzzer_off)
-            elif stimulus_name == "HEATER":
-                self._schedule_cmd_at(turn_off_ms, lambda: self._cmd_heater_set(0))
-            
-            # Schedule next cycle if delay > 0 (otherwise it's just one pulse)
-            if delay_ms > 0:
-                next_cycle_start = cycle_start_ms + cycle_time
-                # Limit to reasonable number of cycles (10 minutes max)
-                if next_cycle_start < 600000:  # 10 minutes = 600,000 ms
-                    # Schedule the next cycle
-                    self._schedule_cmd_at(next_cycle_start, lambda: schedule_cycle(next_cycle_start))
-        
-        # Start first cycle immediately (at time 0)
-        schedule_cycle(0)
-
-    def _timed_fn_wrapper(self, fn: Callable):
+        # One cycle if delay is 0, otherwise every cycle starting within 10 minutes (600,000 ms)
+        n_cycles = (600000 - 1) // cycle_time + 1 if delay_ms > 0 else 1
+        cycle_s = cycle_time / 1000.0
+        dur_s = duration_ms / 1000.0
+        for i in range(n_cycles):
+            start = i * cycle_s
+            plan.append((start, on))
+            plan.append((start + dur_s, off))
+
+    def _plan_pulsed(self, plan: list, label: str, on: bytes, off: bytes, parsed: Tuple[int, int, int, bool]):
+        """
+        Shared VIB/BUZZER/HEATER planning from a _parse_common() tuple: continuous (ON at 0),
+        repeating (duration -> delay -> duration ...) when a duration is given, else a single ON at delay.
+        """
+        delay_ms, duration_ms, level, continuous = parsed
+        if continuous:
+            # Continuous mode: turn on immediately and keep on
+            plan.append((0.0, on))
+            self.log(f"Scheduled {label}: Continuous at level", level)
+        elif duration_ms > 0:
+            # Pulsed mode: duration -> delay -> duration -> delay...
+            self._plan_repeating(plan, on, off, delay_ms, duration_ms)
+            self.log(f"Scheduled {label}: Repeating pattern, duration", duration_ms, "ms, delay", delay_ms,
+                     "ms at level", level)
+        else:
+            # Single pulse
+            plan.append((delay_ms / 1000.0, on))
+            self.log(f"Scheduled {label}: Single pulse at", delay_ms, "ms, level", level)
+
+    def _sched_ir(self, params: Dict[str, Any], plan: list):
+        delay_ms, duration_ms, level, _ = self._parse_common(params, 255)
+        self._plan_on_off(plan, _IR_CMDS[level], _IR_CMDS[0], delay_ms, duration_ms)
+        self.log("Scheduled IR:", delay_ms, "ms ->", duration_ms, "ms at level", level)
+
+    def _sched_white(self, params: Dict[str, Any], plan: list):
+        delay_ms, duration_ms, level, _ = self._parse_common(params, 255)
+        self._plan_on_off(plan, _WHITE_CMDS[level], _WHITE_CMDS[0], delay_ms, duration_ms)
+        self.log("Scheduled WHITE:", delay_ms, "ms ->", duration_ms, "ms at level", level)
+
+    def _sched_pump(self, params: Dict[str, Any], plan: list):
+        delay_ms, duration_ms, level, _ = self._parse_common(params)
+        if level is None:
+            return
+        self._plan_on_off(plan, _PUMP_CMDS[level], _PUMP_CMDS[0], delay_ms, duration_ms)
+        self.log("Scheduled PUMP:", delay_ms, "ms ->", duration_ms, "ms at level", level)
+
+    def _sched_rgb(self, params: Dict[str, Any], plan: list):
+        delay_ms, duration_ms, _, _ = self._parse_common(params)
+        r = _clamp8(params.get("r", 0))
+        g = _clamp8(params.get("g", 0))
+        b = _clamp8(params.get("b", 0))
+        on = f"RGB {r} {g} {b}\n".encode("ascii")
+        self._plan_on_off(plan, on, _RGB_OFF, delay_ms, duration_ms)
+        self.log("Scheduled RGB:", r, g, b, "delay", delay_ms, "dur", duration_ms)
+
+    def _sched_vib(self, params: Dict[str, Any], plan: list):
+        parsed = self._parse_common(params, 200)
+        level = parsed[2]
+        self._plan_pulsed(plan, "VIB", _VIB_CMDS[level], _VIB_CMDS[0], parsed)
+
+    def _sched_buzzer(self, params: Dict[str, Any], plan: list):
+        self._plan_pulsed(plan, "BUZZER", _BUZZER_ON, _BUZZER_OFF, self._parse_common(params, 200))
+
+    def _sched_heater(self, params: Dict[str, Any], plan: list):
+        parsed = self._parse_common(params, 200)
+        level = parsed[2]
+        self._plan_pulsed(plan, "HEATER", _HEATER_CMDS[level], _HEATER_CMDS[0], parsed)
+
+    def _load_plan(self, plan: List[Tuple[float, bytes]], base: float):
+        """Put every planned edge on the scheduler heap (one heapify, one notify)."""
         if self._stop_event.is_set():
             return
-        try:
-            fn()
-        except Exception as e:
-            self.log("ExperimentRunner: scheduled function error:", e)
+        # seq keeps plan order for equal deadlines (an OFF before the next cycle's ON)
+        edges = [(base + t, i, payload) for i, (t, payload) in enumerate(plan)]
+        with self._sched_cv:
+            self._sched_heap.extend(edges)
+            heapq.heapify(self._sched_heap)
+            self._sched_cv.notify()
+
+    def _scheduler_loop(self, gen: int):
+        """Send planned payloads in deadline order until the stop event is set or the run changes."""
+        heap = self._sched_heap
+        cv = self._sched_cv
+        while True:
+            with cv:
+                while not self._stop_event.is_set() and self._gen == gen:
+                    now = time.monotonic()
+                    if heap and heap[0][0] <= now:
+                        break
+                    cv.wait(timeout=(heap[0][0] - now) if heap else None)
+                if self._stop_event.is_set() or self._gen != gen:
+                    return
+                # take every edge that is due now, so they go out in one write
+                now = time.monotonic()
+                due = []
+                while heap and heap[0][0] <= now:
+                    due.append(heapq.heappop(heap)[2])
+            try:
+                self._send_arduino_batch(due)
+            except Exception as e:
+                self.log("ExperimentRunner: scheduled send error:", e)
+
+    def _stop_scheduler(self):
+        """Discard pending events and let the scheduler thread exit (stop event must be set)."""
+        with self._sched_cv:
+            self._sched_heap.clear()
+            self._sched_cv.notify_all()
+        t = self._sched_thread
+        if t is not None and t is not threading.current_thread() and t.is_alive():
+            t.join(timeout=1.0)
 
     # -------------------------
     # Stimulus commands
     # -------------------------
+    # Levels are clamped when the stimulus is parsed (_parse_common); the mask
+    # here is only a cheap final guard for the table index.
     def _cmd_ir_set(self, level: int):
-        level = int(max(0, min(255, level)))
-        self._send_arduino_command(f"IR {level}")
+        self._send_arduino_payload(_IR_CMDS[level & 0xFF])
 
     def _cmd_white_set(self, level: int):
-        level = int(max(0, min(255, level)))
-        self._send_arduino_command(f"WHITE {level}")
+        self._send_arduino_payload(_WHITE_CMDS[level & 0xFF])
 
     def _cmd_vib_set(self, level: int):
-        level = int(max(0, min(255, level)))
-        self._send_arduino_command(f"VIB {level}")
+        self._send_arduino_payload(_VIB_CMDS[level & 0xFF])
 
     def _cmd_pump_set(self, level: int):
-        level = int(max(0, min(255, level)))
-        self._send_arduino_command(f"PUMP {level}")
+        self._send_arduino_payload(_PUMP_CMDS[level & 0xFF])
 
     def _cmd_rgb_set(self, r: int, g: int, b: int):
-        r = int(max(0, min(255, r)))
-        g = int(max(0, min(255, g)))
-        b = int(max(0, min(255, b)))
-        self._send_arduino_command(f"RGB {r} {g} {b}")
+        if not (r or g or b):
+            self._send_arduino_payload(_RGB_OFF)
+            return
+        self._send_arduino_command(f"RGB {r & 0xFF} {g & 0xFF} {b & 0xFF}")
 
     def _cmd_heater_set(self, level: int):
-        level = int(max(0, min(255, level)))
-        self._send_arduino_command(f"HEATER {level}")  # Note: HEATER may not be implemented in Arduino yet
+        # Note: HEATER may not be implemented in Arduino yet
+        self._send_arduino_payload(_HEATER_CMDS[level & 0xFF])
 
     def _cmd_buzzer_on(self):
-        self._send_arduino_command("BUZZER ON")
+        self._send_arduino_payload(_BUZZER_ON)
 
     def _cmd_buzzer_off(self):
-        self._send_arduino_command("BUZZER OFF")
+        self._send_arduino_payload(_BUZZER_OFF)
 
     def _cmd_off_all(self):
         try:
-            self._cmd_ir_set(0)
-            self._cmd_white_set(0)
-            self._cmd_vib_set(0)
-            self._cmd_pump_set(0)
-            self._cmd_rgb_set(0, 0, 0)
-            self._cmd_buzzer_off()
+            with self._command_batch():
+                self._cmd_ir_set(0)
+                self._cmd_white_set(0)
+                self._cmd_vib_set(0)
+                self._cmd_pump_set(0)
+                self._cmd_rgb_set(0, 0, 0)
+                self._cmd_buzzer_off()
+            self._flush_arduino()
         except Exception as e:
             self.log("ExperimentRunner: error in _cmd_off_all:", e)
 
@@ -407,54 +512,220 @@ class ExperimentRunner:
             return self.app
         return None
 
+    def _resolve_arduino(self):
+        """Resolve the controller once and cache it with its bound send methods."""
+        ar = self._get_arduino()
+        self._ar = ar
+        self._send_bytes_fn = getattr(ar, "send_bytes", None)
+        self._send_fn = getattr(ar, "send", None)
+        return ar
+
+    def _flush_arduino(self):
+        """Wait until written commands have left the host (controller flush() or raw .ser)."""
+        ar = self._ar if self._ar is not None else self._resolve_arduino()
+        if ar is None:
+            return
+        fl = getattr(ar, "flush", None) or getattr(getattr(ar, "ser", None), "flush", None)
+        if fl is not None:
+            try:
+                fl()
+            except Exception:
+                pass
+
+    @contextmanager
+    def _command_batch(self):
+        """
+        Collect the commands issued by this thread inside the block and send
+        them as a single newline-delimited write when it exits.
+        Nested blocks join the outermost batch.
+        """
+        if getattr(self._batch, "cmds", None) is not None:
+            yield
+            return
+        self._batch.cmds = []
+        try:
+            yield
+        finally:
+            cmds = self._batch.cmds
+            self._batch.cmds = None
+            if cmds:
+                self._send_arduino_batch(cmds)
+
+    def _send_arduino_batch(self, payloads: List[bytes]):
+        """Send several encoded commands as one payload (replies are not awaited)."""
+        self._send_arduino_payload(payloads[0] if len(payloads) == 1 else b"".join(payloads))
+
     def _send_arduino_command(self, cmd: str) -> Optional[str]:
         """
-        Send a textual command to the Arduino controller.
-        Tries controller.send(cmd) first; falls back to raw serial writes to .ser.
-        Returns any reply or None.
+        Send a textual command to the Arduino controller without waiting for a reply.
+        See _send_arduino_payload(). Always returns None.
         """
-        ar = self._get_arduino()
-        if ar is None:
-            self.log("ExperimentRunner: no arduino available for command:", cmd)
+        return self._send_arduino_payload((cmd.strip() + "\n").encode("utf-8"))
+
+    def _send_arduino_payload(self, payload: bytes) -> Optional[str]:
+        """
+        Send encoded, newline-terminated command(s) without waiting for a reply.
+        Inside _command_batch() the payload is only collected; while a run is
+        active it is queued for the writer thread; otherwise it is written now.
+        Always returns None.
+        """
+        pending = getattr(self._batch, "cmds", None)
+        if pending is not None:
+            pending.append(payload)
+            return None
+        if self._writer_thread is not None:
+            self._outbox.put(payload)
             return None
+        self._write_payload(payload)
+        return None
 
-        # prefer high-level send()
-        try:
-            if hasattr(ar, "send"):
+    def _writer_loop(self):
+        """
+        Drain the outbox: everything queued since the last write goes out as a
+        single payload, so a USB stall delays only this thread, never the scheduler.
+        Exits on the None sentinel from _stop_writer().
+        """
+        get = self._outbox.get
+        get_nowait = self._outbox.get_nowait
+        while True:
+            payload = get()
+            if payload is None:
+                return
+            buf = bytearray(payload)
+            done = False
+            while True:
                 try:
-                    reply = ar.send(cmd)
-                    self.log(f"ARDUINO <- {cmd}  (via ar.send) -> {reply}")
-                    return reply
-                except Exception as e:
-                    self.log("ExperimentRunner: ar.send failed:", e)
-        except Exception:
-            pass
+                    nxt = get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    done = True
+                    break
+                buf += nxt
+            self._write_payload(bytes(buf))
+            if done:
+                return
+
+    def _stop_writer(self):
+        """Let the writer send what is already queued, then stop it."""
+        t = self._writer_thread
+        if t is None:
+            return
+        self._writer_thread = None
+        self._outbox.put(None)
+        if t is not threading.current_thread() and t.is_alive():
+            t.join(timeout=1.0)
+
+    def _write_payload(self, payload: bytes):
+        """
+        Write a payload to the Arduino. Prefers controller.send_bytes(), then
+        controller.send() line by line; falls back to raw serial writes to .ser
+        (replies then arrive on self._reply_q via the reader thread).
+        """
+        ar = self._ar if self._ar is not None else self._resolve_arduino()
+        if ar is None:
+            self.log("ExperimentRunner: no arduino available for command:", payload)
+            return
+
+        # prefer the controller's own send path
+        send_bytes = self._send_bytes_fn
+        send = self._send_fn
+        try:
+            if send_bytes is not None:
+                send_bytes(payload, read_reply=False)
+                self.log("ARDUINO <-", payload, "(via ar.send_bytes)", level=logging.DEBUG)
+                return
+            if send is not None:
+                for line in payload.splitlines():
+                    send(line.decode("utf-8").strip(), read_reply=False)
+                self.log("ARDUINO <-", payload, "(via ar.send)", level=logging.DEBUG)
+                return
+        except Exception as e:
+            self.log("ExperimentRunner: ar.send failed:", e)
 
         # fallback: write to ar.ser if present
         ser = getattr(ar, "ser", None)
         if ser is None:
-            self.log("ExperimentRunner: arduino has no send() or ser to send:", cmd)
-            return None
+            self.log("ExperimentRunner: arduino has no send() or ser to send:", payload)
+            return
 
         try:
-            try:
-                ser.reset_input_buffer()
-            except Exception:
-                pass
-            ser.write((cmd.strip() + "\n").encode("utf-8"))
-            ser.flush()
+            # no flush(): a tcdrain() per command; _cmd_off_all() flushes once
+            ser.write(payload)
+            self.log("ARDUINO <-", payload, "(raw)", level=logging.DEBUG)
         except Exception as e:
             self.log("ExperimentRunner: raw serial write failed:", e)
-            return None
 
-        # attempt to read a line reply (non-blocking-ish)
-        try:
-            deadline = time.time() + 0.6
-            while time.time() < deadline:
-                line = ser.readline().decode(errors="ignore").strip()
+    def _start_reply_reader(self):
+        """
+        When the controller only exposes a raw .ser (no send()), read its replies
+        on a daemon thread for the duration of the run. Controllers with send()
+        consume their own replies, so nothing is started for them.
+        """
+        ar = self._ar
+        if ar is None or self._send_fn is not None:
+            return
+        ser = getattr(ar, "ser", None)
+        if ser is None:
+            return
+        self._reader_thread = threading.Thread(target=self._serial_reader_thread, args=(ser,),
+                                               daemon=True, name="experiment-serial-reader")
+        self._reader_thread.start()
+
+    def _serial_reader_thread(self, ser):
+        fd = None
+        if os.name == "posix":
+            try:
+                fd = ser.fileno()
+            except Exception:
+                fd = None
+        if fd is None:
+            # no selectable fd (e.g. Windows): let pyserial's readline() block
+            while not self._stop_event.is_set():
+                try:
+                    line = ser.readline().decode(errors="ignore").strip()
+                except Exception as e:
+                    self.log("ExperimentRunner: serial read failed:", e)
+                    return
                 if line:
-                    self.log("ARDUINO raw reply:", line)
-                    return line
-        except Exception:
-            pass
-        return None
+                    self._push_reply(line)
+            return
+
+        # block in the kernel until the fd is readable, then take everything available
+        sel = selectors.DefaultSelector()
+        sel.register(fd, selectors.EVENT_READ)
+        data = b""
+        try:
+            while not self._stop_event.is_set():
+                if not sel.select(timeout=0.5):
+                    continue
+                try:
+                    chunk = os.read(fd, 4096)
+                except BlockingIOError:
+                    continue
+                except OSError as e:
+                    self.log("ExperimentRunner: serial read failed:", e)
+                    return
+                if not chunk:
+                    continue
+                data += chunk
+                while b"\n" in data:
+                    raw, data = data.split(b"\n", 1)
+                    line = raw.decode(errors="ignore").strip()
+                    if line:
+                        self._push_reply(line)
+        finally:
+            sel.close()
+
+    def _push_reply(self, line: str):
+        self.log("ARDUINO raw reply:", line, level=logging.DEBUG)
+        item = (time.monotonic(), line)
+        try:
+            self._reply_q.put_nowait(item)
+        except queue.Full:
+            # nobody is collecting replies: keep the most recent ones
+            try:
+                self._reply_q.get_nowait()
+            except queue.Empty:
+                pass
+            self._reply_q.put_nowait(item)
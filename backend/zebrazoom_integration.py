@@ -11,10 +11,18 @@ It allows ZIMON to use ZebraZoom's analysis capabilities for:
 import os
 import sys
 import subprocess
+import signal
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, wait
 import json
 import logging
+import functools
+import threading
+from collections import deque
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+import types
+from types import ModuleType
+from typing import Optional, Dict, Any, List, Tuple
 
 # Optional imports - will be checked before use
 try:
@@ -33,6 +41,241 @@ except ImportError:
 
 logger = logging.getLogger("zebrazoom_integration")
 
+# Record layout returned by detect_bouts (one row per bout, ends exclusive).
+# The kinematic fields are placeholders until they are computed from tracking data.
+BOUT_FIELDS = (
+    ("BoutStart", "i8"),
+    ("BoutEnd", "i8"),
+    ("BoutLength", "i8"),
+    ("FrameStart", "i8"),
+    ("FrameEnd", "i8"),
+    ("MaxSpeed", "f4"),
+    ("TotalDistance", "f4"),
+    ("AvgSpeed", "f4"),
+)
+BOUT_DTYPE = np.dtype(list(BOUT_FIELDS)) if NUMPY_AVAILABLE else None
+
+# Columns fed to cluster_bouts
+_CLUSTER_FEATURES = ("BoutLength", "MaxSpeed", "TotalDistance", "AvgSpeed")
+
+# Numba-compiled bout scanners; resolved on first use because importing numba is slow.
+# None = not tried yet, False = numba unavailable.
+_SCAN_BOUTS_JIT = None
+_SCAN_BOUTS_MULTI_JIT = None
+
+
+def _scan_bouts_impl(x, y, min_d2, min_frames):
+    """
+    Single pass over head positions: frame-to-frame squared distance,
+    threshold and run-length scan. Returns (starts, ends) int64 arrays of the
+    movement runs lasting at least min_frames (ends are exclusive).
+    """
+    n = x.shape[0] - 1
+    if n < 0:
+        n = 0
+    starts = np.empty(n // 2 + 1, dtype=np.int64)
+    ends = np.empty(n // 2 + 1, dtype=np.int64)
+    nb = 0
+    start = -1
+    for i in range(n):
+        dx = x[i + 1] - x[i]
+        dy = y[i + 1] - y[i]
+        if dx * dx + dy * dy > min_d2:
+            if start < 0:
+                start = i
+        elif start >= 0:
+            if i - start >= min_frames:
+                starts[nb] = start
+                ends[nb] = i
+                nb += 1
+            start = -1
+    # bout that extends to the end
+    if start >= 0 and n - start >= min_frames:
+        starts[nb] = start
+        ends[nb] = n
+        nb += 1
+    return starts[:nb], ends[:nb]
+
+
+def _get_scan_bouts():
+    """Return the numba-compiled _scan_bouts_impl, or None if numba is not installed."""
+    global _SCAN_BOUTS_JIT
+    if _SCAN_BOUTS_JIT is None:
+        try:
+            from numba import njit
+            # nogil: several threads can scan different recordings at once
+            _SCAN_BOUTS_JIT = njit(cache=True, nogil=True)(_scan_bouts_impl)
+        except ImportError:
+            logger.info("numba not available; using NumPy bout detection")
+            _SCAN_BOUTS_JIT = False
+    return _SCAN_BOUTS_JIT or None
+
+
+def _get_scan_bouts_multi():
+    """
+    Return a parallel numba kernel scanning every row of (n_animals, n_frames)
+    position arrays, or None if numba is not installed. The kernel returns
+    (starts, ends, counts); row a holds counts[a] valid bouts.
+    """
+    global _SCAN_BOUTS_MULTI_JIT
+    if _SCAN_BOUTS_MULTI_JIT is None:
+        scan = _get_scan_bouts()
+        if scan is None:
+            _SCAN_BOUTS_MULTI_JIT = False
+        else:
+            from numba import njit, prange
+            
+            @njit(parallel=True, nogil=True)
+            def scan_many(X, Y, min_d2, min_frames):
+                n_animals = X.shape[0]
+                cap = max(X.shape[1] - 1, 0) // 2 + 1
+                starts = np.empty((n_animals, cap), dtype=np.int64)
+                ends = np.empty((n_animals, cap), dtype=np.int64)
+                counts = np.zeros(n_animals, dtype=np.int64)
+                for a in prange(n_animals):
+                    s, e = scan(X[a], Y[a], min_d2, min_frames)
+                    nb = s.shape[0]
+                    starts[a, :nb] = s
+                    ends[a, :nb] = e
+                    counts[a] = nb
+                return starts, ends, counts
+            
+            _SCAN_BOUTS_MULTI_JIT = scan_many
+    return _SCAN_BOUTS_MULTI_JIT or None
+
+
+def _make_bouts(starts, ends):
+    """Pack bout start/end index arrays into a BOUT_DTYPE record array."""
+    out = np.zeros(len(starts), dtype=BOUT_DTYPE)
+    out["BoutStart"] = starts
+    out["BoutEnd"] = ends
+    out["BoutLength"] = ends - starts
+    out["FrameStart"] = starts
+    out["FrameEnd"] = ends
+    return out
+
+
+def bouts_to_dict_list(bouts) -> List[Dict[str, Any]]:
+    """Convert a detect_bouts record array to the older list-of-dicts form."""
+    names = bouts.dtype.names
+    return [dict(zip(names, row)) for row in bouts.tolist()]
+
+
+# Default ZebraZoom configuration (copied before use, never mutated)
+_DEFAULT_CONFIG = {
+    "nbWells": 1,
+    "nbAnimalsPerWell": 1,
+    "firstFrame": 0,
+    "lastFrame": -1,
+    "detectBouts": True,
+    "minArea": 400,
+    "maxArea": 800,
+    "headSize": 15,
+    "nbTailPoints": 20
+}
+
+
+def _dump_config(config: Dict[str, Any], pretty: bool) -> bytes:
+    if pretty:
+        return json.dumps(config, indent=2).encode("utf-8")
+    return json.dumps(config, separators=(",", ":")).encode("utf-8")
+
+
+@functools.lru_cache(maxsize=32)
+def _config_bytes(items: Tuple[Tuple[str, Any], ...], pretty: bool = False) -> bytes:
+    """Serialized default config with the given overrides; batch runs reuse the same blob."""
+    config = dict(_DEFAULT_CONFIG)
+    config.update(items)
+    return _dump_config(config, pretty)
+
+
+# Heavy optional dependencies, imported on first use and cached.
+# A missing package raises ImportError at the call site (not cached).
+@functools.lru_cache(maxsize=None)
+def _load_h5py():
+    import h5py
+    return h5py
+
+
+@functools.lru_cache(maxsize=None)
+def _load_sklearn():
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+    return types.SimpleNamespace(KMeans=KMeans, MiniBatchKMeans=MiniBatchKMeans)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_scipy_stats():
+    from scipy import stats
+    return stats
+
+
+@functools.lru_cache(maxsize=None)
+def _load_numexpr():
+    """numexpr module, or None; only used as a fallback, so absence is cached too."""
+    try:
+        import numexpr
+        return numexpr
+    except ImportError:
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _discover_zebrazoom(override: Optional[str]) -> Tuple[Optional[str], Optional[ModuleType]]:
+    """
+    Locate the ZebraZoom executable or Python library.
+    
+    Cached so that each ZebraZoomIntegration() does not re-stat the candidate
+    paths; call _discover_zebrazoom.cache_clear() to search again.
+    
+    Returns:
+        (executable path or None, zebrazoom module or None)
+    """
+    # An explicit path wins
+    if override and os.path.exists(override):
+        logger.info(f"Found ZebraZoom executable at: {override}")
+        return override, None
+    
+    # Common installation paths, as (directory, filename)
+    candidates = [
+        (r"C:\Program Files\ZebraZoom", "ZebraZoom.exe"),
+        (r"C:\Users\{}\Downloads\ZebraZoom-Windows".format(os.getenv("USERNAME", "")), "ZebraZoom.exe"),
+        (os.path.join(os.path.expanduser("~"), "Downloads", "ZebraZoom-Windows"), "ZebraZoom.exe"),
+    ]
+    
+    # One directory listing per folder instead of one stat() per candidate
+    listings: Dict[str, set] = {}
+    for directory, filename in candidates:
+        if directory not in listings:
+            try:
+                with os.scandir(directory) as it:
+                    listings[directory] = {os.path.normcase(e.name) for e in it}
+            except OSError:
+                listings[directory] = set()
+        if os.path.normcase(filename) in listings[directory]:
+            path = os.path.join(directory, filename)
+            logger.info(f"Found ZebraZoom executable at: {path}")
+            return path, None
+    
+    # Try to import as Python library
+    try:
+        import zebrazoom
+        logger.info("ZebraZoom library found via import")
+        return None, zebrazoom
+    except ImportError:
+        logger.warning("ZebraZoom not found. Analysis features will be limited.")
+        return None, None
+
+
+def _analyze_one_video(zebrazoom_path: Optional[str], video_path: str,
+                       config_path: Optional[str], output_dir: Optional[str],
+                       timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Worker for ZebraZoomIntegration.analyze_videos (must stay picklable)."""
+    try:
+        return ZebraZoomIntegration(zebrazoom_path).analyze_video(video_path, config_path, output_dir,
+                                                                  timeout=timeout)
+    except Exception as e:
+        return {"status": "error", "video": video_path, "error": str(e)}
+
 
 class ZebraZoomIntegration:
     """
@@ -62,27 +305,12 @@ class ZebraZoomIntegration:
     
     def _find_zebrazoom(self):
         """Try to locate ZebraZoom installation"""
-        # Common installation paths
-        possible_paths = [
-            self.zebrazoom_path,
-            r"C:\Program Files\ZebraZoom\ZebraZoom.exe",
-            r"C:\Users\{}\Downloads\ZebraZoom-Windows\ZebraZoom.exe".format(os.getenv("USERNAME", "")),
-            os.path.join(os.path.expanduser("~"), "Downloads", "ZebraZoom-Windows", "ZebraZoom.exe"),
-        ]
-        
-        for path in possible_paths:
-            if path and os.path.exists(path):
-                self.zebrazoom_exe = path
-                logger.info(f"Found ZebraZoom executable at: {path}")
-                return
-        
-        # Try to import as Python library
-        try:
-            import zebrazoom
-            self.zebrazoom_lib = zebrazoom
-            logger.info("ZebraZoom library found via import")
-        except ImportError:
-            logger.warning("ZebraZoom not found. Analysis features will be limited.")
+        self.zebrazoom_exe, self.zebrazoom_lib = _discover_zebrazoom(self.zebrazoom_path)
+    
+    def rescan(self):
+        """Forget the cached discovery result and search for ZebraZoom again"""
+        _discover_zebrazoom.cache_clear()
+        self._find_zebrazoom()
     
     def is_available(self) -> bool:
         """Check if ZebraZoom is available"""
@@ -95,7 +323,8 @@ class ZebraZoomIntegration:
         return zebrazoom_available
     
     def analyze_video(self, video_path: str, config_path: Optional[str] = None, 
-                     output_dir: Optional[str] = None) -> Dict[str, Any]:
+                     output_dir: Optional[str] = None,
+                     timeout: Optional[float] = 3600) -> Dict[str, Any]:
         """
         Run ZebraZoom analysis on a video file.
         
@@ -103,6 +332,8 @@ class ZebraZoomIntegration:
             video_path: Path to video file to analyze
             config_path: Path to ZebraZoom config JSON file (optional)
             output_dir: Directory to save results (optional)
+            timeout: Seconds before the ZebraZoom executable is killed
+                     (the in-process library path cannot be interrupted)
             
         Returns:
             Dictionary with analysis results
@@ -117,7 +348,68 @@ class ZebraZoomIntegration:
         if self.zebrazoom_lib:
             return self._analyze_with_library(video_path, config_path, output_dir)
         else:
-            return self._analyze_with_exe(video_path, config_path, output_dir)
+            return self._analyze_with_exe(video_path, config_path, output_dir, timeout)
+    
+    def analyze_videos(self, video_paths: List[str], config_path: Optional[str] = None,
+                       output_dir: Optional[str] = None, workers: Optional[int] = None,
+                       timeout: float = 3600) -> List[Dict[str, Any]]:
+        """
+        Run ZebraZoom analysis on several videos in parallel worker processes.
+        
+        Batches of fewer than 3 videos run serially, since starting the pool
+        would cost more than it saves.
+        
+        Args:
+            video_paths: Video files to analyze
+            config_path: ZebraZoom config JSON shared by all videos (optional)
+            output_dir: Directory to save results (optional)
+            workers: Number of worker processes (default: CPU count)
+            timeout: Per-video timeout in seconds; each ZebraZoom process is
+                     killed when it runs longer. The whole batch is given
+                     timeout per round of workers, after which unfinished
+                     videos are reported as errors and pending ones cancelled.
+            
+        Returns:
+            One result dict per video, in input order. Failed videos get
+            {"status": "error", "video": ..., "error": ...} instead of raising.
+        """
+        if not self.is_available():
+            raise RuntimeError("ZebraZoom is not available")
+        
+        paths = list(video_paths)
+        if len(paths) < 3:
+            return [_analyze_one_video(self.zebrazoom_exe, p, config_path, output_dir, timeout)
+                    for p in paths]
+        
+        # never fork: the GUI process is multithreaded (Qt, serial reader)
+        ctx = mp.get_context("forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn")
+        n_workers = min(workers or os.cpu_count() or 1, len(paths))
+        # one deadline for the batch; slack covers worker start-up
+        budget = timeout * -(-len(paths) // n_workers) + 30 if timeout is not None else None
+        
+        pool = ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx)
+        try:
+            futures = [pool.submit(_analyze_one_video, self.zebrazoom_exe, p, config_path, output_dir, timeout)
+                       for p in paths]
+            wait(futures, timeout=budget)
+        finally:
+            # returns at once; queued videos are cancelled, running ones end at their own timeout
+            pool.shutdown(wait=False, cancel_futures=True)
+        
+        results = []
+        for path, future in zip(paths, futures):
+            if not future.done():
+                logger.error(f"Error analyzing {path}: batch deadline exceeded")
+                results.append({"status": "error", "video": path, "error": "batch deadline exceeded"})
+                continue
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.error(f"Error analyzing {path}: {e}")
+                results.append({"status": "error", "video": path, "error": str(e)})
+        
+        logger.info(f"Batch analysis finished for {len(paths)} videos")
+        return results
     
     def _analyze_with_library(self, video_path: str, config_path: Optional[str], 
                               output_dir: Optional[str]) -> Dict[str, Any]:
@@ -146,7 +438,7 @@ class ZebraZoomIntegration:
             raise
     
     def _analyze_with_exe(self, video_path: str, config_path: Optional[str],
-                          output_dir: Optional[str]) -> Dict[str, Any]:
+                          output_dir: Optional[str], timeout: Optional[float] = 3600) -> Dict[str, Any]:
         """Analyze video using ZebraZoom executable"""
         try:
             import os
@@ -205,32 +497,21 @@ class ZebraZoomIntegration:
             
             logger.info(f"Running ZebraZoom with command: {' '.join(cmd)}")
             
-            # Run ZebraZoom
-            # Change to video directory so ZebraZoom can find relative paths
-            original_cwd = os.getcwd()
-            try:
-                os.chdir(video_dir)
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=3600,  # 1 hour timeout
-                    cwd=video_dir
-                )
-            finally:
-                os.chdir(original_cwd)
-            
-            if result.returncode != 0:
-                error_msg = result.stderr if result.stderr else result.stdout
-                raise RuntimeError(f"ZebraZoom analysis failed: {error_msg}")
+            # Run ZebraZoom from the video directory so it can find relative paths
+            # (cwd applies to the child only; the process-wide cwd is left alone)
+            returncode, tail = self._run_streaming(cmd, cwd=video_dir, timeout=timeout)
+            
+            output = "\n".join(tail)
+            if returncode != 0:
+                raise RuntimeError(f"ZebraZoom analysis failed: {output}")
             
             logger.info(f"Analysis completed for {video_path}")
-            logger.info(f"ZebraZoom output: {result.stdout}")
+            logger.info(f"ZebraZoom output (last {len(tail)} lines): {output}")
             
             return {
                 "status": "success",
                 "video": video_path,
-                "output": result.stdout,
+                "output": output,
                 "config_used": cmd[-1]  # Last argument is config file
             }
             
@@ -240,12 +521,76 @@ class ZebraZoomIntegration:
             logger.error(f"Error analyzing with executable: {e}", exc_info=True)
             raise
     
-    def extract_parameters(self, tracking_data_path: str):
+    def _run_streaming(self, cmd: List[str], cwd: Optional[str] = None,
+                       timeout: Optional[float] = None, tail_lines: int = 200):
+        """
+        Run a command, logging its combined stdout/stderr line by line.
+        
+        Only the last tail_lines lines are kept in memory, so a verbose run
+        cannot grow the buffer without bound.
+        
+        Returns:
+            (return code, list of the last output lines)
+        
+        Raises:
+            subprocess.TimeoutExpired: if the process outlives timeout (it is killed)
+        """
+        tail = deque(maxlen=tail_lines)
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            bufsize=1,
+            text=True,
+            errors="replace",
+            cwd=cwd,
+            # own process group, so a timeout also kills anything the executable spawned
+            start_new_session=(os.name == "posix")
+        )
+        
+        def _pump():
+            for line in proc.stdout:
+                line = line.rstrip()
+                tail.append(line)
+                logger.debug(f"ZebraZoom: {line}")
+        
+        reader = threading.Thread(target=_pump, name="zebrazoom-output", daemon=True)
+        reader.start()
+        try:
+            returncode = proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            if os.name == "posix":
+                try:
+                    os.killpg(proc.pid, signal.SIGKILL)
+                except OSError:
+                    proc.kill()
+            else:
+                proc.kill()
+            proc.wait()
+            raise
+        finally:
+            reader.join(timeout=5)
+            # closing under a reader still blocked in readline() would block too;
+            # a surviving reader closes nothing and ends at EOF on its own
+            if not reader.is_alive():
+                proc.stdout.close()
+        return returncode, list(tail)
+    
+    def extract_parameters(self, tracking_data_path: str,
+                           columns: Optional[List[str]] = None,
+                           dtype=None):
         """
         Extract behavioral parameters from tracking data.
         
+        Only 1-D numeric datasets are loaded; each one is read straight into a
+        preallocated array of the requested dtype and handed to pandas
+        without a further copy.
+        
         Args:
             tracking_data_path: Path to ZebraZoom output (.h5 file)
+            columns: Dataset names to load (default: all)
+            dtype: Target dtype for the loaded columns (default: float32)
             
         Returns:
             DataFrame with extracted parameters (or dict if pandas not available)
@@ -254,7 +599,11 @@ class ZebraZoomIntegration:
             raise ImportError("pandas is required for parameter extraction. Install with: pip install pandas")
         
         try:
-            import h5py
+            h5py = _load_h5py()
+            
+            if dtype is None:
+                dtype = np.float32
+            wanted = set(columns) if columns else None
             
             # Load ZebraZoom output
             with h5py.File(tracking_data_path, 'r') as f:
@@ -263,15 +612,21 @@ class ZebraZoomIntegration:
                 # parse ZebraZoom's specific HDF5 structure
                 data = {}
                 
-                # Try to read common keys
-                for key in f.keys():
-                    try:
-                        data[key] = f[key][:]
-                    except:
-                        pass
-            
+                for key, node in f.items():
+                    if wanted is not None and key not in wanted:
+                        continue
+                    # Skip groups, multi-dimensional and non-numeric datasets up front;
+                    # anything that still fails to read is a real I/O error
+                    if not isinstance(node, h5py.Dataset):
+                        continue
+                    if node.ndim != 1 or node.dtype.kind not in "iuf":
+                        continue
+                    buf = np.empty(node.shape, dtype=dtype)
+                    if node.size:
+                        node.read_direct(buf)
+                    data[key] = buf
             # Convert to DataFrame
-            df = pd.DataFrame(data)
+            df = pd.DataFrame(data, copy=False)
             return df
             
         except Exception as e:
@@ -280,22 +635,31 @@ class ZebraZoomIntegration:
     
     def detect_bouts(self, tracking_data, 
                     min_distance: float = 5.0,
-                    min_frames: int = 10) -> List[Dict[str, Any]]:
+                    min_frames: int = 10,
+                    precision: str = "float32") -> "np.ndarray":
         """
         Detect movement bouts from tracking data.
         
+        Head coordinates are cast to contiguous float32 before the distance
+        math: pixel positions fit comfortably in float32, and it halves the
+        memory traffic. Distances that land within float32 rounding of
+        min_distance may classify differently than in float64; pass
+        precision="float64" to reproduce the old results exactly.
+        
         Args:
             tracking_data: DataFrame with tracking data (HeadX, HeadY, etc.)
             min_distance: Minimum distance threshold for bout detection
             min_frames: Minimum frames for a valid bout
+            precision: "float32" (default) or "float64"
             
         Returns:
-            List of bout dictionaries
+            Structured array of bouts (dtype BOUT_DTYPE); use
+            bouts_to_dict_list() for the older list-of-dicts form
         """
         if not NUMPY_AVAILABLE:
             raise ImportError("numpy is required for bout detection. Install with: pip install numpy")
         
-        bouts = []
+        bouts = np.zeros(0, dtype=BOUT_DTYPE)
         
         # Handle both DataFrame and dict
         if PANDAS_AVAILABLE and isinstance(tracking_data, pd.DataFrame):
@@ -315,92 +679,159 @@ class ZebraZoomIntegration:
             logger.warning("Unsupported tracking data format")
             return bouts
         
-        # Calculate instantaneous distances
-        distances = np.sqrt(
-            np.diff(head_x)**2 + 
-            np.diff(head_y)**2
-        )
+        dtype = np.float64 if precision == "float64" else np.float32
+        head_x = np.ascontiguousarray(head_x, dtype=dtype)
+        head_y = np.ascontiguousarray(head_y, dtype=dtype)
+        
+        # sqrt is monotonic, so compare squared distances (negative threshold: every step moves)
+        min_d2 = float(min_distance) * float(min_distance) if min_distance >= 0 else -1.0
+        
+        scan = _get_scan_bouts()
+        if scan is not None:
+            starts, ends = scan(head_x, head_y, min_d2, int(min_frames))
+            bouts = _make_bouts(starts, ends)
+            logger.info(f"Detected {len(bouts)} bouts")
+            return bouts
+
+        ne = _load_numexpr()
+        if ne is not None:
+            # Fused distance + threshold in a single pass, no temporaries
+            movement_frames = ne.evaluate(
+                "(hx1 - hx0)**2 + (hy1 - hy0)**2 > thr2",
+                local_dict={"hx1": head_x[1:], "hx0": head_x[:-1],
+                            "hy1": head_y[1:], "hy0": head_y[:-1],
+                            "thr2": dtype(min_d2)})
+        else:
+            # Squared instantaneous distances, computed in two reused buffers
+            n = max(head_x.shape[0] - 1, 0)
+            d2 = np.empty(n, dtype=dtype)
+            tmp = np.empty(n, dtype=dtype)
+            np.subtract(head_x[1:], head_x[:-1], out=d2)
+            np.multiply(d2, d2, out=d2)
+            np.subtract(head_y[1:], head_y[:-1], out=tmp)
+            np.multiply(tmp, tmp, out=tmp)
+            np.add(d2, tmp, out=d2)
+            
+            # Find frames with movement above threshold
+            movement_frames = d2 > min_d2
         
-        # Find frames with movement above threshold
-        movement_frames = distances > min_distance
-        
-        # Detect bout start/end
-        bout_start = None
-        for i, is_moving in enumerate(movement_frames):
-            if is_moving and bout_start is None:
-                bout_start = i
-            elif not is_moving and bout_start is not None:
-                bout_length = i - bout_start
-                if bout_length >= min_frames:
-                    bouts.append({
-                        "BoutStart": bout_start,
-                        "BoutEnd": i,
-                        "BoutLength": bout_length,
-                        "FrameStart": bout_start,
-                        "FrameEnd": i
-                    })
-                bout_start = None
-        
-        # Handle bout that extends to end
-        if bout_start is not None:
-            bout_length = len(movement_frames) - bout_start
-            if bout_length >= min_frames:
-                bouts.append({
-                    "BoutStart": bout_start,
-                    "BoutEnd": len(movement_frames),
-                    "BoutLength": bout_length,
-                    "FrameStart": bout_start,
-                    "FrameEnd": len(movement_frames)
-                })
+        # Bout start/end = rising/falling edges of the movement mask
+        # (padding with 0 closes a bout that extends to the end)
+        edges = np.diff(movement_frames.view(np.int8), prepend=np.int8(0), append=np.int8(0))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        keep = (ends - starts) >= min_frames
+        bouts = _make_bouts(starts[keep], ends[keep])
         
         logger.info(f"Detected {len(bouts)} bouts")
         return bouts
     
-    def cluster_bouts(self, bouts_data: List[Dict[str, Any]], 
+    def detect_bouts_multi(self, tracking_data,
+                           min_distance: float = 5.0,
+                           min_frames: int = 10,
+                           precision: str = "float32") -> List["np.ndarray"]:
+        """
+        Detect movement bouts for every animal in a multi-animal recording.
+        
+        Animals are read from HeadX_0/HeadY_0, HeadX_1/HeadY_1, ... columns.
+        With numba installed they are scanned in parallel; otherwise each
+        animal goes through detect_bouts in turn.
+        
+        Args:
+            tracking_data: DataFrame or dict with per-animal HeadX_i/HeadY_i columns
+            min_distance: Minimum distance threshold for bout detection
+            min_frames: Minimum frames for a valid bout
+            precision: "float32" (default) or "float64"
+            
+        Returns:
+            One bout record array (dtype BOUT_DTYPE) per animal, in index order
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for bout detection. Install with: pip install numpy")
+        
+        keys = tracking_data.columns if PANDAS_AVAILABLE and isinstance(tracking_data, pd.DataFrame) \
+            else tracking_data.keys()
+        n_animals = 0
+        while f"HeadX_{n_animals}" in keys and f"HeadY_{n_animals}" in keys:
+            n_animals += 1
+        if n_animals == 0:
+            logger.warning("Tracking data has no HeadX_i/HeadY_i columns")
+            return []
+        
+        dtype = np.float64 if precision == "float64" else np.float32
+        X = np.stack([np.asarray(tracking_data[f"HeadX_{a}"], dtype=dtype) for a in range(n_animals)])
+        Y = np.stack([np.asarray(tracking_data[f"HeadY_{a}"], dtype=dtype) for a in range(n_animals)])
+        
+        scan_many = _get_scan_bouts_multi()
+        if scan_many is None:
+            return [self.detect_bouts({"HeadX": X[a], "HeadY": Y[a]}, min_distance,
+                                      min_frames, precision) for a in range(n_animals)]
+        
+        min_d2 = float(min_distance) * float(min_distance) if min_distance >= 0 else -1.0
+        starts, ends, counts = scan_many(X, Y, min_d2, int(min_frames))
+        result = [_make_bouts(starts[a, :n], ends[a, :n]) for a, n in enumerate(counts.tolist())]
+        logger.info(f"Detected {sum(counts.tolist())} bouts across {n_animals} animals")
+        return result
+    
+    def cluster_bouts(self, bouts_data, 
                      n_clusters: int = 5) -> Dict[str, Any]:
         """
         Cluster bouts using unsupervised learning.
         
         Args:
-            bouts_data: List of bout dictionaries with features
+            bouts_data: Bout record array from detect_bouts, or list of bout dictionaries
             n_clusters: Number of clusters
             
         Returns:
-            Dictionary with clustering results
+            Dictionary with clustering results; "clusters" is a list indexed
+            by cluster label
         """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for clustering. Install with: pip install numpy")
+        
         try:
-            from sklearn.cluster import KMeans
-            from sklearn.preprocessing import StandardScaler
+            sklearn = _load_sklearn()
             
             # Extract features from bouts
-            features = []
-            for bout in bouts_data:
-                feature_vector = [
-                    bout.get("BoutLength", 0),
-                    bout.get("MaxSpeed", 0),
-                    bout.get("TotalDistance", 0),
-                    bout.get("AvgSpeed", 0),
-                ]
-                features.append(feature_vector)
-            
-            if len(features) < n_clusters:
-                logger.warning(f"Not enough bouts ({len(features)}) for {n_clusters} clusters")
+            n_bouts = len(bouts_data)
+            if n_bouts < n_clusters:
+                logger.warning(f"Not enough bouts ({n_bouts}) for {n_clusters} clusters")
                 return {"clusters": [], "labels": []}
             
-            # Normalize features
-            scaler = StandardScaler()
-            features_scaled = scaler.fit_transform(features)
-            
-            # Perform clustering
-            kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-            labels = kmeans.fit_predict(features_scaled)
-            
-            # Organize results
-            clusters = {}
-            for i, label in enumerate(labels):
-                if label not in clusters:
-                    clusters[label] = []
-                clusters[label].append(bouts_data[i])
+            features = np.empty((n_bouts, len(_CLUSTER_FEATURES)), dtype=np.float32)
+            if isinstance(bouts_data, np.ndarray):
+                for j, name in enumerate(_CLUSTER_FEATURES):
+                    features[:, j] = bouts_data[name]
+            else:
+                for i, bout in enumerate(bouts_data):
+                    features[i] = [bout.get(name, 0) for name in _CLUSTER_FEATURES]
+            
+            # Z-score in place (constant columns are left centred at 0)
+            mu = features.mean(axis=0)
+            sigma = features.std(axis=0)
+            sigma[sigma == 0] = 1.0
+            features -= mu
+            features /= sigma
+            
+            # Perform clustering; full-batch KMeans gets slow on large recordings
+            if n_bouts > 5000:
+                kmeans = sklearn.MiniBatchKMeans(n_clusters=n_clusters, random_state=42,
+                                                 n_init=3, batch_size=1024)
+            else:
+                kmeans = sklearn.KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+            labels = kmeans.fit_predict(features)
+            
+            # Organize results: clusters[k] holds the bouts labelled k
+            order = np.argsort(labels, kind="stable")
+            bounds = np.searchsorted(labels[order], np.arange(n_clusters + 1))
+            if isinstance(bouts_data, np.ndarray):
+                # One gather, then zero-copy slices of it
+                grouped = bouts_data[order]
+                clusters = [grouped[bounds[k]:bounds[k + 1]] for k in range(n_clusters)]
+            else:
+                order = order.tolist()
+                clusters = [[bouts_data[i] for i in order[bounds[k]:bounds[k + 1]]]
+                            for k in range(n_clusters)]
             
             logger.info(f"Clustered {len(bouts_data)} bouts into {n_clusters} clusters")
             
@@ -436,31 +867,48 @@ class ZebraZoomIntegration:
             raise ImportError("pandas is required for population comparison. Install with: pip install pandas")
         
         try:
-            from scipy import stats
+            stats = _load_scipy_stats()
             
             comparison = {}
             
             # Compare common metrics
-            metrics = ['Speed', 'Distance', 'BoutFrequency', 'BoutDuration']
-            
-            for metric in metrics:
-                if metric in data1.columns and metric in data2.columns:
-                    group1_data = data1[metric].dropna()
-                    group2_data = data2[metric].dropna()
-                    
-                    if len(group1_data) > 0 and len(group2_data) > 0:
-                        # Statistical test
-                        stat, p_value = stats.mannwhitneyu(group1_data, group2_data, 
-                                                          alternative='two-sided')
-                        
-                        comparison[metric] = {
-                            f"{label1}_mean": float(group1_data.mean()),
-                            f"{label1}_std": float(group1_data.std()),
-                            f"{label2}_mean": float(group2_data.mean()),
-                            f"{label2}_std": float(group2_data.std()),
-                            "p_value": float(p_value),
-                            "significant": p_value < 0.05
-                        }
+            metrics = [m for m in ('Speed', 'Distance', 'BoutFrequency', 'BoutDuration')
+                       if m in data1.columns and m in data2.columns]
+            A = data1[metrics].to_numpy(dtype=np.float64)
+            B = data2[metrics].to_numpy(dtype=np.float64)
+            n1 = np.count_nonzero(~np.isnan(A), axis=0)
+            n2 = np.count_nonzero(~np.isnan(B), axis=0)
+            valid = (n1 > 0) & (n2 > 0)
+            if not valid.any():
+                # Nothing to test
+                logger.info(f"Compared {label1} vs {label2}")
+                return comparison
+            
+            metrics = [m for m, ok in zip(metrics, valid) if ok]
+            A = A[:, valid]
+            B = B[:, valid]
+            
+            # Statistical test, all metrics ranked in one call
+            _, p_values = stats.mannwhitneyu(A, B, axis=0, alternative='two-sided',
+                                             nan_policy='omit')
+            p_values = np.atleast_1d(p_values)
+            # ddof=1 to match pandas Series.std()
+            means1 = np.nanmean(A, axis=0)
+            stds1 = np.nanstd(A, axis=0, ddof=1)
+            means2 = np.nanmean(B, axis=0)
+            stds2 = np.nanstd(B, axis=0, ddof=1)
+            
+            for metric, m1, s1, m2, s2, p_value in zip(
+                    metrics, means1.tolist(), stds1.tolist(), means2.tolist(), stds2.tolist(),
+                    p_values.tolist()):
+                comparison[metric] = {
+                    f"{label1}_mean": m1,
+                    f"{label1}_std": s1,
+                    f"{label2}_mean": m2,
+                    f"{label2}_std": s2,
+                    "p_value": p_value,
+                    "significant": p_value < 0.05
+                }
             
             logger.info(f"Compared {label1} vs {label2}")
             return comparison
@@ -474,35 +922,31 @@ class ZebraZoomIntegration:
     
     def _get_default_config(self) -> Dict[str, Any]:
         """Get default ZebraZoom configuration"""
-        return {
-            "nbWells": 1,
-            "nbAnimalsPerWell": 1,
-            "firstFrame": 0,
-            "lastFrame": -1,
-            "detectBouts": True,
-            "minArea": 400,
-            "maxArea": 800,
-            "headSize": 15,
-            "nbTailPoints": 20
-        }
+        return dict(_DEFAULT_CONFIG)
     
-    def create_config_file(self, output_path: str, **kwargs) -> str:
+    def create_config_file(self, output_path: str, pretty: bool = False, **kwargs) -> str:
         """
         Create a ZebraZoom configuration file.
         
         Args:
             output_path: Path to save config file
+            pretty: Write indented JSON for humans (default: compact, which is
+                    all ZebraZoom needs)
             **kwargs: Configuration parameters
             
         Returns:
             Path to created config file
         """
-        config = self._get_default_config()
-        config.update(kwargs)
+        try:
+            data = _config_bytes(tuple(sorted(kwargs.items())), pretty)
+        except TypeError:
+            # Unhashable override values (lists, dicts) bypass the cache
+            config = self._get_default_config()
+            config.update(kwargs)
+            data = _dump_config(config, pretty)
         
-        with open(output_path, 'w') as f:
-            json.dump(config, f, indent=2)
+        with open(output_path, 'wb') as f:
+            f.write(data)
         
         logger.info(f"Created config file: {output_path}")
         return output_path
-
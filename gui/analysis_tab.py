@@ -6,33 +6,80 @@ Provides behavioral analysis capabilities using ZebraZoom integration.
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QFileDialog, QGroupBox, QTableWidget, QTableWidgetItem,
-    QTextEdit, QProgressBar, QComboBox, QSpinBox, QMessageBox
+    QTextEdit, QProgressBar, QComboBox, QSpinBox, QMessageBox, QSizePolicy
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
 import logging
-import os
+import time
 from pathlib import Path
 
 logger = logging.getLogger("analysis_tab")
 
+# File dialog filters
+_VIDEO_FILTER = "Video Files (*.avi *.mp4 *.mov *.mkv);;All Files (*)"
+_CONFIG_FILTER = "JSON Files (*.json);;All Files (*)"
 
-class AnalysisWorker(QThread):
-    """Worker thread for running analysis"""
+# One size policy shared by the small action buttons
+_BUTTON_POLICY = QSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+
+
+def _make_button(text, slot):
+    """Small action button sized to its label"""
+    btn = QPushButton(text)
+    btn.clicked.connect(slot)
+    btn.setSizePolicy(_BUTTON_POLICY)
+    return btn
+
+
+class AnalysisSignals(QObject):
+    """Signals emitted by AnalysisRunnable (QRunnable itself cannot emit)"""
     progress = pyqtSignal(int)
     status = pyqtSignal(str)
     finished = pyqtSignal(dict)
     error = pyqtSignal(str)
+
+
+class AnalysisRunnable(QRunnable):
+    """Analysis job run on the global QThreadPool"""
+    
+    # At most one progress/status update per 50 ms reaches the GUI thread
+    EMIT_INTERVAL_NS = 50_000_000
     
     def __init__(self, zebrazoom_integration, video_path, config_path=None):
         super().__init__()
+        self.signals = AnalysisSignals()
         self.zebrazoom = zebrazoom_integration
         self.video_path = video_path
         self.config_path = config_path
+        self._last_pct = -1
+        self._last_pct_ns = 0
+        self._last_status = None
+        self._last_status_ns = 0
+    
+    def _emit_progress(self, pct, force=False):
+        """Emit progress only if it changed and the rate limit allows (or force)"""
+        if pct == self._last_pct:
+            return
+        now = time.monotonic_ns()
+        if force or now - self._last_pct_ns >= self.EMIT_INTERVAL_NS:
+            self._last_pct = pct
+            self._last_pct_ns = now
+            self.signals.progress.emit(pct)
+    
+    def _emit_status(self, text, force=False):
+        """Emit status only if it changed and the rate limit allows (or force)"""
+        if text == self._last_status:
+            return
+        now = time.monotonic_ns()
+        if force or now - self._last_status_ns >= self.EMIT_INTERVAL_NS:
+            self._last_status = text
+            self._last_status_ns = now
+            self.signals.status.emit(text)
     
     def run(self):
         try:
-            self.status.emit("Starting analysis...")
-            self.progress.emit(10)
+            self._emit_status("Starting analysis...")
+            self._emit_progress(10)
             
             # Run analysis
             result = self.zebrazoom.analyze_video(
@@ -40,12 +87,30 @@ class AnalysisWorker(QThread):
                 self.config_path
             )
             
-            self.progress.emit(100)
-            self.status.emit("Analysis complete")
-            self.finished.emit(result)
+            # Final state always goes through
+            self._emit_progress(100, force=True)
+            self._emit_status("Analysis complete", force=True)
+            self.signals.finished.emit(result)
             
         except Exception as e:
-            self.error.emit(str(e))
+            self.signals.error.emit(str(e))
+
+
+class _LazyGroupBox(QGroupBox):
+    """QGroupBox whose contents are built by builder(box) the first time it is needed"""
+    
+    def __init__(self, title, builder):
+        super().__init__(title)
+        self._builder = builder
+    
+    def ensure_built(self):
+        if self._builder is not None:
+            builder, self._builder = self._builder, None
+            builder(self)
+    
+    def showEvent(self, event):
+        self.ensure_built()
+        super().showEvent(event)
 
 
 class AnalysisTab(QWidget):
@@ -58,6 +123,7 @@ class AnalysisTab(QWidget):
         self.bouts = []
         self.video_path = None
         self.config_path = None
+        self._zz_warning_label = None
         
         self._build_ui()
         
@@ -71,15 +137,9 @@ class AnalysisTab(QWidget):
             "⚠️ ZebraZoom is not available.\n"
             "Please install ZebraZoom or specify its path in Settings (⚙ icon)."
         )
-        warning_label.setStyleSheet("""
-            color: #f5c542;
-            font-size: 12px;
-            padding: 12px;
-            background: #2b2f3a;
-            border-radius: 8px;
-            border: 1px solid #f5c542;
-        """)
+        warning_label.setObjectName("AnalysisWarning")
         warning_label.setWordWrap(True)
+        self._zz_warning_label = warning_label
         
         # Insert at the top
         layout = self.layout()
@@ -92,7 +152,7 @@ class AnalysisTab(QWidget):
         
         # Header
         header = QLabel("Behavioral Analysis")
-        header.setStyleSheet("font-size: 18px; font-weight: 600; color: #ffffff; padding: 8px 0px;")
+        header.setObjectName("AnalysisHeader")
         layout.addWidget(header)
         
         # File selection section
@@ -106,10 +166,8 @@ class AnalysisTab(QWidget):
         video_layout.setSpacing(10)
         
         self.video_path_label = QLabel("No video selected")
-        self.video_path_label.setStyleSheet("color: #9aa0aa; padding: 4px;")
-        video_btn = QPushButton("Select Video")
-        video_btn.clicked.connect(self._select_video)
-        video_btn.setMinimumWidth(120)
+        self.video_path_label.setObjectName("AnalysisPath")
+        video_btn = _make_button("Select Video", self._select_video)
         
         video_layout.addWidget(QLabel("Video:"))
         video_layout.addWidget(self.video_path_label, 1)
@@ -122,10 +180,8 @@ class AnalysisTab(QWidget):
         config_layout.setSpacing(10)
         
         self.config_path_label = QLabel("Using default config")
-        self.config_path_label.setStyleSheet("color: #9aa0aa; padding: 4px;")
-        config_btn = QPushButton("Select Config")
-        config_btn.clicked.connect(self._select_config)
-        config_btn.setMinimumWidth(120)
+        self.config_path_label.setObjectName("AnalysisPath")
+        config_btn = _make_button("Select Config", self._select_config)
         
         config_layout.addWidget(QLabel("Config:"))
         config_layout.addWidget(self.config_path_label, 1)
@@ -146,13 +202,24 @@ class AnalysisTab(QWidget):
         
         # Status label
         self.status_label = QLabel("")
-        self.status_label.setStyleSheet("color: #9aa0aa; font-size: 11px;")
+        self.status_label.setObjectName("AnalysisStatus")
         file_layout.addWidget(self.status_label)
         
         layout.addWidget(file_section)
         
-        # Results section
-        results_section = QGroupBox("Analysis Results")
+        # Results, bout and clustering sections are filled in on first show
+        self.results_section = _LazyGroupBox("Analysis Results", self._build_results_section)
+        layout.addWidget(self.results_section)
+        
+        self.bout_section = _LazyGroupBox("Bout Detection", self._build_bout_section)
+        layout.addWidget(self.bout_section)
+        
+        self.cluster_section = _LazyGroupBox("Behavioral Clustering", self._build_cluster_section)
+        layout.addWidget(self.cluster_section)
+        
+        layout.addStretch()
+    
+    def _build_results_section(self, results_section):
         results_layout = QVBoxLayout(results_section)
         results_layout.setContentsMargins(16, 20, 16, 16)
         results_layout.setSpacing(12)
@@ -163,11 +230,8 @@ class AnalysisTab(QWidget):
         self.results_table.setHorizontalHeaderLabels(["Parameter", "Value", "Unit", "Notes"])
         self.results_table.horizontalHeader().setStretchLastSection(True)
         results_layout.addWidget(self.results_table)
-        
-        layout.addWidget(results_section)
-        
-        # Bout detection section
-        bout_section = QGroupBox("Bout Detection")
+    
+    def _build_bout_section(self, bout_section):
         bout_layout = QVBoxLayout(bout_section)
         bout_layout.setContentsMargins(16, 20, 16, 16)
         bout_layout.setSpacing(12)
@@ -191,21 +255,17 @@ class AnalysisTab(QWidget):
         
         params_layout.addStretch()
         
-        detect_btn = QPushButton("Detect Bouts")
-        detect_btn.clicked.connect(self._detect_bouts)
+        detect_btn = _make_button("Detect Bouts", self._detect_bouts)
         params_layout.addWidget(detect_btn)
         
         bout_layout.addLayout(params_layout)
         
         # Bout results
         self.bout_count_label = QLabel("Bouts detected: 0")
-        self.bout_count_label.setStyleSheet("color: #4fc3f7; font-weight: 600;")
+        self.bout_count_label.setObjectName("BoutCount")
         bout_layout.addWidget(self.bout_count_label)
-        
-        layout.addWidget(bout_section)
-        
-        # Clustering section
-        cluster_section = QGroupBox("Behavioral Clustering")
+    
+    def _build_cluster_section(self, cluster_section):
         cluster_layout = QVBoxLayout(cluster_section)
         cluster_layout.setContentsMargins(16, 20, 16, 16)
         cluster_layout.setSpacing(12)
@@ -221,19 +281,14 @@ class AnalysisTab(QWidget):
         
         cluster_params.addStretch()
         
-        cluster_btn = QPushButton("Cluster Bouts")
-        cluster_btn.clicked.connect(self._cluster_bouts)
+        cluster_btn = _make_button("Cluster Bouts", self._cluster_bouts)
         cluster_params.addWidget(cluster_btn)
         
         cluster_layout.addLayout(cluster_params)
         
         self.cluster_results_label = QLabel("")
-        self.cluster_results_label.setStyleSheet("color: #9aa0aa;")
+        self.cluster_results_label.setObjectName("ClusterResults")
         cluster_layout.addWidget(self.cluster_results_label)
-        
-        layout.addWidget(cluster_section)
-        
-        layout.addStretch()
     
     def _select_video(self):
         """Select video file for analysis"""
@@ -241,13 +296,14 @@ class AnalysisTab(QWidget):
             self,
             "Select Video File",
             "",
-            "Video Files (*.avi *.mp4 *.mov *.mkv);;All Files (*)"
+            _VIDEO_FILTER
         )
         
         if file_path:
-            self.video_path_label.setText(os.path.basename(file_path))
-            self.video_path_label.setToolTip(file_path)
-            self.video_path = file_path
+            p = Path(file_path)
+            self.video_path = str(p)
+            self.video_path_label.setText(p.name)
+            self.video_path_label.setToolTip(self.video_path)
     
     def _select_config(self):
         """Select ZebraZoom config file"""
@@ -255,13 +311,14 @@ class AnalysisTab(QWidget):
             self,
             "Select Config File",
             "",
-            "JSON Files (*.json);;All Files (*)"
+            _CONFIG_FILTER
         )
         
         if file_path:
-            self.config_path_label.setText(os.path.basename(file_path))
-            self.config_path_label.setToolTip(file_path)
-            self.config_path = file_path
+            p = Path(file_path)
+            self.config_path = str(p)
+            self.config_path_label.setText(p.name)
+            self.config_path_label.setToolTip(self.config_path)
         else:
             self.config_path = None
             self.config_path_label.setText("Using default config")
@@ -287,17 +344,18 @@ class AnalysisTab(QWidget):
         self.progress_bar.setValue(0)
         self.status_label.setText("Preparing analysis...")
         
-        # Create worker thread
-        self.worker = AnalysisWorker(
+        # Run on the shared thread pool (threads are reused between runs)
+        self.worker = AnalysisRunnable(
             self.zebrazoom,
             self.video_path,
             getattr(self, 'config_path', None)
         )
-        self.worker.progress.connect(self.progress_bar.setValue)
-        self.worker.status.connect(self.status_label.setText)
-        self.worker.finished.connect(self._on_analysis_finished)
-        self.worker.error.connect(self._on_analysis_error)
-        self.worker.start()
+        queued = Qt.ConnectionType.QueuedConnection
+        self.worker.signals.progress.connect(self.progress_bar.setValue, queued)
+        self.worker.signals.status.connect(self.status_label.setText, queued)
+        self.worker.signals.finished.connect(self._on_analysis_finished, queued)
+        self.worker.signals.error.connect(self._on_analysis_error, queued)
+        QThreadPool.globalInstance().start(self.worker)
     
     def _on_analysis_finished(self, result):
         """Handle analysis completion"""
@@ -320,20 +378,29 @@ class AnalysisTab(QWidget):
     
     def _display_results(self, result):
         """Display analysis results in table"""
-        # Clear existing results
-        self.results_table.setRowCount(0)
-        
         # Add result rows (simplified - would parse actual ZebraZoom output)
+        rows = []
         if isinstance(result, dict):
-            row = 0
-            for key, value in result.items():
-                if key not in ['status', 'video', 'output']:
-                    self.results_table.insertRow(row)
-                    self.results_table.setItem(row, 0, QTableWidgetItem(str(key)))
-                    self.results_table.setItem(row, 1, QTableWidgetItem(str(value)))
-                    self.results_table.setItem(row, 2, QTableWidgetItem(""))
-                    self.results_table.setItem(row, 3, QTableWidgetItem(""))
-                    row += 1
+            rows = [(k, v) for k, v in result.items() if k not in ('status', 'video', 'output')]
+        
+        # Fill in one go: no repaint or model signal per cell
+        self.results_section.ensure_built()
+        table = self.results_table
+        table.setUpdatesEnabled(False)
+        table.blockSignals(True)
+        sorting = table.isSortingEnabled()
+        table.setSortingEnabled(False)
+        try:
+            table.setRowCount(0)
+            table.setRowCount(len(rows))
+            for row, (key, value) in enumerate(rows):
+                # Unit/Notes columns are left empty (no items)
+                table.setItem(row, 0, QTableWidgetItem(str(key)))
+                table.setItem(row, 1, QTableWidgetItem(str(value)))
+        finally:
+            table.setSortingEnabled(sorting)
+            table.blockSignals(False)
+            table.setUpdatesEnabled(True)
     
     def _detect_bouts(self):
         """Detect movement bouts from tracking data"""
@@ -360,7 +427,7 @@ class AnalysisTab(QWidget):
     
     def _cluster_bouts(self):
         """Cluster detected bouts"""
-        if not self.bouts:
+        if len(self.bouts) == 0:
             QMessageBox.warning(self, "No Bouts", "Please detect bouts first")
             return
         
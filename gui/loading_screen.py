@@ -3,6 +3,11 @@ from PyQt6.QtWidgets import QWidget, QLabel, QVBoxLayout
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont
 
+_QSS_WINDOW = "background-color: #121016; border-radius: 14px;"
+_QSS_TITLE = "color: #8B5CF6;"
+_QSS_SUBTITLE = "color: #AAAAAA;"
+_QSS_STATUS = "color: #CCCCCC;"
+
 
 class LoadingScreen(QWidget):
     def __init__(self):
@@ -13,7 +18,7 @@ class LoadingScreen(QWidget):
             | Qt.WindowType.WindowStaysOnTopHint
         )
         self.setFixedSize(420, 260)
-        self.setStyleSheet("background-color: #121016; border-radius: 14px;")
+        self.setStyleSheet(_QSS_WINDOW)
 
         layout = QVBoxLayout(self)
         layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -26,15 +31,15 @@ class LoadingScreen(QWidget):
         title = QLabel("ZIMON")
         title.setFont(QFont("Segoe UI", 26, QFont.Weight.Bold))
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title.setStyleSheet("color: #8B5CF6;")
+        title.setStyleSheet(_QSS_TITLE)
 
         subtitle = QLabel("Behaviour Tracking System")
         subtitle.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        subtitle.setStyleSheet("color: #AAAAAA;")
+        subtitle.setStyleSheet(_QSS_SUBTITLE)
 
         self.status = QLabel("Initializing…")
         self.status.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.status.setStyleSheet("color: #CCCCCC;")
+        self.status.setStyleSheet(_QSS_STATUS)
 
         layout.addWidget(logo)
         layout.addWidget(title)
@@ -42,14 +47,27 @@ class LoadingScreen(QWidget):
         layout.addSpacing(10)
         layout.addWidget(self.status)
 
+        self._frames = ("Initializing", "Initializing.", "Initializing..", "Initializing...")
         self._dot_count = 0
         self._timer = QTimer(self)
+        self._timer.setInterval(450)
         self._timer.timeout.connect(self._animate)
-        self._timer.start(450)
+
+    # Only animate while visible: no wakeups once the splash is gone
+    def showEvent(self, event):
+        if not self._timer.isActive():
+            self._timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
 
     def _animate(self):
-        self._dot_count = (self._dot_count + 1) % 4
-        self.status.setText("Initializing" + "." * self._dot_count)
+        self._dot_count = (self._dot_count + 1) & 3
+        self.status.setText(self._frames[self._dot_count])
 
     def set_status(self, text: str):
+        # an explicit status replaces the animation
+        self._timer.stop()
         self.status.setText(text)
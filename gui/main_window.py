@@ -1,17 +1,130 @@
 ﻿from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QTabWidget, QGroupBox, QPushButton,
+    QLabel, QTabWidget, QGroupBox, QPushButton, QFrame,
     QCheckBox, QSlider, QSpinBox, QColorDialog
 )
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QTimer, QObject, QThread, QMetaObject, QSignalBlocker, pyqtSignal, pyqtSlot
 from PyQt6.QtGui import QIcon
 import logging
 import time
-from gui.settings_dialog import SettingsDialog
-from gui.analysis_tab import AnalysisTab
+
+
+# Slider value (0-100) -> PWM duty (0-255)
+_PWM_TABLE = tuple(int(v * 255 / 100) for v in range(101))
+
+
+def _val(widget):
+    """Value of an optional slider/spin box; 0 when the widget was never built"""
+    return widget.value() if widget else 0
+
+
+def _set_state(widget, state):
+    """Switch a widget's ``state`` property and re-apply the stylesheet rules for it"""
+    if widget.property("state") == state:
+        return
+    widget.setProperty("state", state)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+
+
+class ArduinoWorker(QObject):
+    """Runs blocking Arduino serial I/O on its own thread; results come back as signals"""
+    commandCompleted = pyqtSignal(str, str, str)   # name, command, reply
+    commandFailed = pyqtSignal(str, str, str)      # name, command, error
+    temperatureChanged = pyqtSignal(float)         # pushed by the firmware, or polled
+    connectionLost = pyqtSignal()
+    reconnectFinished = pyqtSignal(bool, str)      # ok, port or error message
+
+    # Fallback TEMP? poll for firmware that doesn't push readings
+    POLL_INTERVAL_MS = 2000
+
+    def __init__(self, arduino):
+        super().__init__()
+        self.arduino = arduino
+        self._last_push = 0.0
+        self._poll_timer = None
+        # the controller calls these from its serial reader thread
+        arduino.temperature_callback = self._on_pushed_temperature
+        arduino.disconnect_callback = self.connectionLost.emit
+
+    def _on_pushed_temperature(self, temp):
+        self._last_push = time.monotonic()
+        self.temperatureChanged.emit(temp)
+
+    @pyqtSlot()
+    def start_polling(self):
+        """Start the fallback poll; call on the worker thread so the timer lives there"""
+        if self._poll_timer is None:
+            self._poll_timer = QTimer(self)
+            self._poll_timer.setInterval(self.POLL_INTERVAL_MS)
+            self._poll_timer.timeout.connect(self.poll_temperature)
+        self._poll_timer.start()
+
+    @pyqtSlot()
+    def stop_polling(self):
+        if self._poll_timer is not None:
+            self._poll_timer.stop()
+
+    @pyqtSlot()
+    def poll_temperature(self):
+        # firmware that pushes readings never needs the TEMP? round-trip
+        if time.monotonic() - self._last_push < 2 * self.POLL_INTERVAL_MS / 1000:
+            return
+        if not self.arduino.is_connected():
+            return
+        try:
+            temp = self.arduino.read_temperature_c()
+        except Exception as e:
+            logging.getLogger("main_window").error(f"Failed to read temperature: {e}")
+            return
+        if temp is not None:
+            self.temperatureChanged.emit(float(temp))
+
+    @pyqtSlot(str)
+    def reconnect(self, port):
+        """Connect to port, or auto-detect when empty; takes seconds when no board answers"""
+        try:
+            ok = self.arduino.connect(port) if port else self.arduino.auto_connect()
+        except Exception as e:
+            logging.getLogger("main_window").error(f"Error during connect: {e}", exc_info=True)
+            self.reconnectFinished.emit(False, f"Error: {str(e)[:30]}")
+            return
+        if ok:
+            self.reconnectFinished.emit(True, str(getattr(self.arduino, 'port', None) or 'Unknown'))
+        else:
+            self.reconnectFinished.emit(False, "Not connected")
+
+    @pyqtSlot(str, str)
+    def send_cmd(self, name, cmd):
+        try:
+            reply = self.arduino.send(cmd)
+            self.commandCompleted.emit(name, cmd, str(reply))
+        except Exception as e:
+            self.commandFailed.emit(name, cmd, str(e))
 
 
 class MainWindow(QMainWindow):
+    # Emitted when the cached Arduino connection state flips
+    arduinoStateChanged = pyqtSignal(bool)
+    # Requests to the Arduino worker thread
+    requestSend = pyqtSignal(str, str)
+    requestReconnect = pyqtSignal(str)
+    requestStartPolling = pyqtSignal()
+    requestStopPolling = pyqtSignal()
+
+    # Arduino command prefix per control; Buzzer and Heater are not in the firmware yet
+    _ENV_PREFIX = {"IR Light": "IR", "White Light": "WHITE", "Pump": "PUMP"}
+    _STIM_PREFIX = {"Vibration": "VIB"}
+
+    # Experiment config key and the widget attributes that feed it, per stimulus:
+    # (key, enable, intensity slider, continuous, duration, delay)
+    _STIMULI_SPECS = (
+        ("VIB", "vib_enable", "vib_slider", "vib_continuous", "vib_duration", "vib_delay"),
+        ("BUZZER", "buzzer_enable", "buzzer_slider", "buzzer_continuous", "buzzer_duration", "buzzer_delay"),
+        ("HEATER", "heater_enable", "heater_slider", "heater_continuous", "heater_duration", "heater_delay"),
+    )
+
     def __init__(self, runner=None, arduino=None, camera=None):
         super().__init__()
         self.runner = runner
@@ -19,13 +132,18 @@ class MainWindow(QMainWindow):
         self.camera = camera
         self.logger = logging.getLogger("main_window")
         
-        # Initialize ZebraZoom integration
-        try:
-            from backend.zebrazoom_integration import ZebraZoomIntegration
-            self.zebrazoom = ZebraZoomIntegration()
-        except Exception as e:
-            self.logger.warning(f"ZebraZoom integration not available: {e}")
-            self.zebrazoom = None
+        # Last known connection state; refreshed by connect/status checks and the
+        # controller's disconnect notification, so slider handlers don't query it
+        self._arduino_connected = False
+        # Failed send-time reconnects back off (2 s doubling to 60 s) so a dead
+        # Arduino isn't re-probed on every slider movement
+        self._next_reconnect_attempt = 0.0
+        self._reconnect_backoff = 0.0
+        # a connect/auto_connect is running on the worker thread
+        self._reconnect_pending = False
+        
+        # ZebraZoom integration is loaded with the Analysis tab (or by the settings dialog)
+        self.zebrazoom = None
 
         # Widget references for backend integration
         self.ir_slider = None
@@ -35,6 +153,7 @@ class MainWindow(QMainWindow):
         self.pump_slider = None
         self.pump_enable = None
         self.temp_label = None
+        self._last_temp_str = None
         self.arduino_status_label = None
         
         self.vib_slider = None
@@ -52,15 +171,62 @@ class MainWindow(QMainWindow):
         self.heater_duration = None
         self.heater_delay = None
         self.heater_continuous = None
+        # Created on the first "Pick Color" click and reused afterwards
+        self._color_dialog = None
+        # Enable checkbox per channel, looked up by the shared slider slots
+        self._channel_enables = {}
+        # Enable checkbox -> the slider it gates
+        self._enable_to_slider = {}
+        # Duration/delay widgets per stimulus, toggled by the Continuous checkbox
+        self._stim_timing_widgets = {}
+        
+        # Serial I/O runs on a worker thread so a slow or stalled Arduino never blocks the UI
+        self._arduino_thread = None
+        self._arduino_worker = None
+        if self.arduino:
+            queued = Qt.ConnectionType.QueuedConnection
+            self._arduino_thread = QThread(self)
+            self._arduino_thread.setObjectName("arduino-io")
+            self._arduino_worker = ArduinoWorker(self.arduino)
+            self._arduino_worker.moveToThread(self._arduino_thread)
+            self.requestSend.connect(self._arduino_worker.send_cmd, queued)
+            self.requestReconnect.connect(self._arduino_worker.reconnect, queued)
+            self._arduino_worker.reconnectFinished.connect(self._on_reconnect_finished, queued)
+            self._arduino_worker.commandCompleted.connect(self._on_command_completed, queued)
+            self._arduino_worker.commandFailed.connect(self._on_command_failed, queued)
+            self._arduino_worker.temperatureChanged.connect(self._set_temp_label, queued)
+            self._arduino_worker.connectionLost.connect(self._on_arduino_lost, queued)
+            self.requestStartPolling.connect(self._arduino_worker.start_polling, queued)
+            self.requestStopPolling.connect(self._arduino_worker.stop_polling, queued)
+            self._arduino_thread.started.connect(self._arduino_worker.start_polling)
+            self._arduino_thread.start()
         
-        # Temperature update timer
-        self.temp_timer = QTimer()
-        self.temp_timer.timeout.connect(self._update_temperature)
-        self.temp_timer.start(2000)  # Update every 2 seconds
+        # Slider sends are coalesced: only the latest value per channel goes out
+        # once the slider has been still for 40 ms
+        self._pending = {}
+        self._send_timer = QTimer(self)
+        self._send_timer.setSingleShot(True)
+        self._send_timer.setInterval(40)
+        self._send_timer.timeout.connect(self._flush_pending)
         
-        # Experiment timer
-        self.experiment_timer = None
+        # Experiment timer; single-shot, each tick schedules the next one on the
+        # next whole second
+        self.experiment_timer = QTimer(self)
+        self.experiment_timer.setSingleShot(True)
+        self.experiment_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.experiment_timer.setInterval(1000)
+        self.experiment_timer.timeout.connect(self._update_experiment_timer)
         self.experiment_start_time = None
+        self._last_elapsed_s = -1
+        # Experiment config rebuilt in place on each start; the runner compiles the
+        # stimuli up front and gets a shallow copy for the keys its run thread reads
+        self._scratch_stimuli = {
+            spec[0]: {"level": 0, "continuous": False, "duration_ms": 0, "delay_ms": 0}
+            for spec in self._STIMULI_SPECS
+        }
+        self._scratch_config = {"duration_s": 0, "stimuli": {}}
+        # Last value applied per (widget id, attribute) by _set_text/_set_enabled
+        self._ui_state = {}
 
         self.setWindowTitle("ZIMON — Behaviour Tracking System")
         self.resize(1400, 850)
@@ -103,33 +269,12 @@ class MainWindow(QMainWindow):
         # Arduino connection status
         status_label = QLabel("Arduino: Checking...")
         status_label.setObjectName("ArduinoStatus")
-        status_label.setStyleSheet("color: #9aa0aa; font-size: 11px; padding: 4px 8px;")
         self.arduino_status_label = status_label
         layout.addWidget(status_label)
         
         # Settings button
         settings_btn = QPushButton("⚙")
         settings_btn.setObjectName("SettingsButton")
-        settings_btn.setStyleSheet("""
-            QPushButton#SettingsButton {
-                background: transparent;
-                border: 1px solid #2b2f3a;
-                border-radius: 6px;
-                padding: 6px 12px;
-                font-size: 18px;
-                color: #b8bcc8;
-                min-width: 36px;
-                max-width: 36px;
-            }
-            QPushButton#SettingsButton:hover {
-                background: #252830;
-                border-color: #7c5cff;
-                color: #ffffff;
-            }
-            QPushButton#SettingsButton:pressed {
-                background: #1d1f26;
-            }
-        """)
         settings_btn.setToolTip("Settings")
         settings_btn.clicked.connect(self._show_settings)
         layout.addWidget(settings_btn)
@@ -139,16 +284,35 @@ class MainWindow(QMainWindow):
     # ---------- TABS ----------
     def _build_tabs(self):
         self.tabs = QTabWidget()
-        self.tabs.addTab(self._environment_tab(), "Environment")
-        self.tabs.addTab(self._experiment_tab(), "Experiment")
-        self.tabs.addTab(self._placeholder_tab("Presets"), "Presets")
+        self._environment_tab_index = self.tabs.addTab(self._environment_tab(), "Environment")
         
+        # The other tabs are built the first time they are shown
+        self._tab_factories = {}
+        self._add_lazy_tab("Experiment", self._experiment_tab)
+        self._add_lazy_tab("Presets", lambda: self._placeholder_tab("Presets"))
         # Analysis tab with ZebraZoom integration
-        self.analysis_tab = AnalysisTab(self.zebrazoom)
-        self.tabs.addTab(self.analysis_tab, "Analysis")
+        self._add_lazy_tab("Analysis", self._analysis_tab)
         
+        self.tabs.currentChanged.connect(self._on_tab_changed)
         return self.tabs
 
+    def _add_lazy_tab(self, title, factory):
+        page = QWidget()
+        layout = QVBoxLayout(page)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self._tab_factories[self.tabs.addTab(page, title)] = factory
+
+    def _on_tab_changed(self, index):
+        """Build a tab on its first visit; poll the temperature only while Environment is shown"""
+        factory = self._tab_factories.pop(index, None)
+        if factory is not None:
+            self.tabs.widget(index).layout().addWidget(factory())
+        if self._arduino_thread is not None:
+            if index == self._environment_tab_index:
+                self.requestStartPolling.emit()
+            else:
+                self.requestStopPolling.emit()
+
     # ---------- ENVIRONMENT TAB ----------
     def _environment_tab(self):
         page = QWidget()
@@ -222,6 +386,18 @@ class MainWindow(QMainWindow):
 
         return page
 
+    # ---------- ANALYSIS TAB ----------
+    def _analysis_tab(self):
+        from gui.analysis_tab import AnalysisTab
+        if self.zebrazoom is None:
+            try:
+                from backend.zebrazoom_integration import ZebraZoomIntegration
+                self.zebrazoom = ZebraZoomIntegration()
+            except Exception as e:
+                self.logger.warning(f"ZebraZoom integration not available: {e}")
+        self.analysis_tab = AnalysisTab(self.zebrazoom)
+        return self.analysis_tab
+
     # ---------- CAMERA ----------
     def _camera_preview_box(self):
         box = QGroupBox("Camera Preview")
@@ -247,18 +423,16 @@ class MainWindow(QMainWindow):
         # Camera status indicator
         status_layout = QHBoxLayout()
         status_indicator = QLabel("●")
-        status_indicator.setStyleSheet("color: #4fc3f7; font-size: 12px;")
+        status_indicator.setObjectName("CameraStatusIndicator")
         status_text = QLabel("Ready")
-        status_text.setStyleSheet("color: #b8bcc8; font-weight: 500;")
+        status_text.setObjectName("StatusText")
         status_layout.addWidget(status_indicator)
         status_layout.addWidget(status_text)
         status_layout.addStretch()
         layout.addLayout(status_layout)
 
         # Separator
-        separator = QLabel("")
-        separator.setStyleSheet("background: #2b2f3a; min-height: 1px; max-height: 1px;")
-        layout.addWidget(separator)
+        layout.addWidget(self._hline())
 
         # Camera parameters
         fps_label = QLabel("FPS: —")
@@ -268,7 +442,7 @@ class MainWindow(QMainWindow):
         
         # Style the labels for better readability
         for label in [fps_label, exposure_label, gain_label, resolution_label]:
-            label.setStyleSheet("padding: 6px 0px; color: #e6e6e6;")
+            label.setObjectName("CameraParameter")
         
         layout.addWidget(fps_label)
         layout.addWidget(exposure_label)
@@ -288,35 +462,35 @@ class MainWindow(QMainWindow):
         # Status indicator
         status_layout = QHBoxLayout()
         self.experiment_status_indicator = QLabel("●")
-        self.experiment_status_indicator.setStyleSheet("color: #9aa0aa; font-size: 14px;")
+        self.experiment_status_indicator.setObjectName("ExperimentStatusIndicator")
         self.experiment_status_text = QLabel("Not Running")
-        self.experiment_status_text.setStyleSheet("color: #b8bcc8; font-weight: 600; font-size: 13px;")
+        self.experiment_status_text.setObjectName("ExperimentStatusText")
         status_layout.addWidget(self.experiment_status_indicator)
         status_layout.addWidget(self.experiment_status_text)
         status_layout.addStretch()
         layout.addLayout(status_layout)
 
         # Separator
-        separator = QLabel("")
-        separator.setStyleSheet("background: #2b2f3a; min-height: 1px; max-height: 1px;")
-        layout.addWidget(separator)
+        layout.addWidget(self._hline())
 
         # Active stimuli
         stimuli_label = QLabel("Active Stimuli:")
-        stimuli_label.setStyleSheet("color: #9aa0aa; font-size: 12px; padding-top: 4px;")
+        stimuli_label.setObjectName("ActiveStimuliCaption")
         layout.addWidget(stimuli_label)
         
         self.active_stimuli_list = QLabel("None")
-        self.active_stimuli_list.setStyleSheet("color: #e6e6e6; font-size: 11px; padding-left: 8px;")
+        self.active_stimuli_list.setObjectName("ActiveStimuli")
         self.active_stimuli_list.setWordWrap(True)
         layout.addWidget(self.active_stimuli_list)
 
         # Recording status
         recording_layout = QHBoxLayout()
         recording_label = QLabel("Recording:")
-        recording_label.setStyleSheet("color: #9aa0aa; font-size: 12px;")
+        recording_label.setObjectName("RecordingCaption")
         self.recording_status = QLabel("● Not Recording")
-        self.recording_status.setStyleSheet("color: #d04f4f; font-size: 11px;")
+        self.recording_status.setObjectName("RecordingStatus")
+        # Labels coloured by the experiment state ([state="ok"] rules in styles.qss)
+        self._experiment_state_widgets = (self.experiment_status_indicator, self.recording_status)
         recording_layout.addWidget(recording_label)
         recording_layout.addWidget(self.recording_status)
         recording_layout.addStretch()
@@ -343,9 +517,9 @@ class MainWindow(QMainWindow):
         layout.addLayout(self._slider_row("Pump"))
 
         # Separator before temperature
-        separator = QLabel("")
-        separator.setStyleSheet("background: #2b2f3a; min-height: 1px; max-height: 1px; margin: 8px 0;")
-        layout.addWidget(separator)
+        layout.addSpacing(8)
+        layout.addWidget(self._hline())
+        layout.addSpacing(8)
 
         # Temperature display with icon-like styling
         temp_container = QHBoxLayout()
@@ -387,6 +561,14 @@ class MainWindow(QMainWindow):
         return box
 
     # ---------- HELPERS ----------
+    def _hline(self):
+        """1 px horizontal rule, coloured by QFrame#Separator in styles.qss"""
+        line = QFrame()
+        line.setObjectName("Separator")
+        line.setFrameShape(QFrame.Shape.HLine)
+        line.setFixedHeight(1)
+        return line
+
     def _slider_row(self, name):
         row = QHBoxLayout()
         row.setSpacing(12)
@@ -411,12 +593,14 @@ class MainWindow(QMainWindow):
             self.pump_slider = slider
             self.pump_enable = enable
 
-        # Connect enable checkbox to slider
-        enable.toggled.connect(lambda checked, s=slider: s.setEnabled(checked))
-        enable.toggled.connect(lambda checked, s=slider, n=name: self._on_enable_toggled(checked, s, n))
-        
-        # Connect slider to backend
-        slider.valueChanged.connect(lambda val, n=name: self._on_slider_changed(val, n))
+        # Connect enable checkbox and slider to backend (shared slots; the channel
+        # travels as a property)
+        slider.setProperty("zimon_channel", name)
+        enable.setProperty("zimon_channel", name)
+        self._channel_enables[name] = enable
+        self._enable_to_slider[enable] = slider
+        enable.toggled.connect(self._env_enable_slot, Qt.ConnectionType.UniqueConnection)
+        slider.valueChanged.connect(self._env_slider_slot, Qt.ConnectionType.UniqueConnection)
 
         row.addWidget(label)
         row.addWidget(enable)
@@ -489,27 +673,32 @@ class MainWindow(QMainWindow):
             self.heater_delay = delay_spin
             self.heater_continuous = continuous_cb
 
-        # Connect enable checkbox
-        enable_cb.toggled.connect(lambda checked, s=intensity_slider: s.setEnabled(checked))
-        enable_cb.toggled.connect(lambda checked, s=intensity_slider, n=name: self._on_stimulus_enable_toggled(checked, s, n))
-        
-        # Connect slider
-        intensity_slider.valueChanged.connect(lambda val, n=name: self._on_stimulus_slider_changed(val, n))
+        # Connect enable checkbox and slider
+        intensity_slider.setProperty("zimon_channel", name)
+        enable_cb.setProperty("zimon_channel", name)
+        self._channel_enables[name] = enable_cb
+        self._enable_to_slider[enable_cb] = intensity_slider
+        enable_cb.toggled.connect(self._stim_enable_slot, Qt.ConnectionType.UniqueConnection)
+        intensity_slider.valueChanged.connect(self._stim_slider_slot, Qt.ConnectionType.UniqueConnection)
 
         # Connect continuous checkbox to disable/enable duration and delay
-        def on_continuous_toggled(checked):
-            duration_spin.setEnabled(not checked)
-            delay_spin.setEnabled(not checked)
-            duration_label.setEnabled(not checked)
-            delay_label.setEnabled(not checked)
-            if checked:
-                duration_spin.setValue(0)
-                delay_spin.setValue(0)
-        
-        continuous_cb.toggled.connect(on_continuous_toggled)
+        self._stim_timing_widgets[name] = (duration_spin, delay_spin, duration_label, delay_label)
+        continuous_cb.setProperty("zimon_channel", name)
+        continuous_cb.toggled.connect(self._on_continuous_toggled, Qt.ConnectionType.UniqueConnection)
         
         return row
 
+    def _on_continuous_toggled(self, checked):
+        duration_spin, delay_spin, duration_label, delay_label = \
+            self._stim_timing_widgets[self.sender().property("zimon_channel")]
+        duration_spin.setEnabled(not checked)
+        delay_spin.setEnabled(not checked)
+        duration_label.setEnabled(not checked)
+        delay_label.setEnabled(not checked)
+        if checked:
+            duration_spin.setValue(0)
+            delay_spin.setValue(0)
+
     def _rgb_row(self):
         row = QHBoxLayout()
         row.setSpacing(10)
@@ -524,12 +713,19 @@ class MainWindow(QMainWindow):
 
         pick = QPushButton("Pick Color")
         pick.setMinimumWidth(100)
-        pick.clicked.connect(lambda: QColorDialog.getColor())
+        pick.clicked.connect(self._on_rgb_pick)
         row.addWidget(pick)
 
         row.addStretch()
         return row
 
+    def _on_rgb_pick(self):
+        """Pick a colour; the dialog is kept, so it reopens on the last choice"""
+        if self._color_dialog is None:
+            self._color_dialog = QColorDialog(self)
+        # The firmware has no RGB output yet, so the colour is not sent anywhere
+        self._color_dialog.exec()
+
     def _placeholder_tab(self, name):
         page = QWidget()
         layout = QVBoxLayout(page)
@@ -550,46 +746,42 @@ class MainWindow(QMainWindow):
             self._update_arduino_status(False, "Not initialized")
             return
         
-        # Check connection status - try a test command first
-        # Sometimes is_connected() returns False even when working
-        is_actually_connected = False
-        
-        # First check the obvious way
         if self.arduino.is_connected():
-            # If is_connected() says True, trust it (commands are working)
-            is_actually_connected = True
-        
-        if not is_actually_connected:
-            # Try to auto-connect if not already connected
-            self.logger.info("Attempting to auto-connect Arduino...")
-            self._update_arduino_status(False, "Connecting...")
-            try:
-                if self.arduino.auto_connect():
-                    self.logger.info("Arduino auto-connected successfully")
-                    # Test connection with a STATUS command
-                    try:
-                        reply = self.arduino.send("STATUS")
-                        self.logger.info(f"Connection test: STATUS -> {reply}")
-                        port = getattr(self.arduino, 'port', 'Unknown')
-                        self._update_arduino_status(True, f"Connected ({port})")
-                    except Exception as e:
-                        self.logger.warning(f"Connection test failed: {e}")
-                        # Still mark as connected if auto_connect succeeded
-                        port = getattr(self.arduino, 'port', 'Unknown')
-                        self._update_arduino_status(True, f"Connected ({port})")
-                else:
-                    self.logger.warning("Arduino auto-connect failed - check if Arduino is connected and firmware is loaded")
-                    self._update_arduino_status(False, "Not connected")
-            except Exception as e:
-                self.logger.error(f"Error during auto-connect: {e}", exc_info=True)
-                self._update_arduino_status(False, f"Error: {str(e)[:30]}")
-        else:
             self.logger.info("Arduino already connected")
             port = getattr(self.arduino, 'port', 'Unknown')
             self._update_arduino_status(True, f"Connected ({port})")
+        else:
+            # Try to auto-connect if not already connected (on the worker thread)
+            self.logger.info("Attempting to auto-connect Arduino...")
+            self._request_reconnect()
+
+    def _request_reconnect(self, port=""):
+        """Ask the worker to connect to port (auto-detect when empty); the result arrives in _on_reconnect_finished"""
+        if self._reconnect_pending:
+            return
+        self._reconnect_pending = True
+        self._update_arduino_status(False, "Connecting...")
+        self.requestReconnect.emit(port or "")
+
+    def _on_reconnect_finished(self, ok, message):
+        self._reconnect_pending = False
+        if ok:
+            self.logger.info("Arduino connected")
+            self._update_arduino_status(True, f"Connected ({message})")
+            # deliver the values that were waiting for the connection
+            if self._pending:
+                self._send_timer.start()
+        else:
+            self.logger.warning("Arduino connect failed - check if Arduino is connected and firmware is loaded")
+            self._reconnect_backoff = min(60.0, self._reconnect_backoff * 2 or 2.0)
+            self._next_reconnect_attempt = time.monotonic() + self._reconnect_backoff
+            self._pending.clear()
+            self._update_arduino_status(False, message)
     
     def _show_settings(self):
         """Show settings dialog"""
+        # Imported here: the dialog (and its serial port enumeration) is only needed on demand
+        from gui.settings_dialog import SettingsDialog
         dialog = SettingsDialog(self.arduino, self, self.zebrazoom)
         dialog.exec()
         # Update status after settings dialog closes
@@ -606,109 +798,94 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'analysis_tab'):
             self.analysis_tab.zebrazoom = self.zebrazoom
             # Remove warning if ZebraZoom is now available
-            if self.zebrazoom and self.zebrazoom.is_available():
-                # Remove warning label if exists
-                layout = self.analysis_tab.layout()
-                if layout:
-                    for j in range(layout.count()):
-                        item = layout.itemAt(j)
-                        if item and item.widget():
-                            widget_item = item.widget()
-                            if isinstance(widget_item, QLabel) and "⚠️" in widget_item.text():
-                                widget_item.deleteLater()
+            warning = self.analysis_tab._zz_warning_label
+            if warning is not None and self.zebrazoom and self.zebrazoom.is_available():
+                warning.deleteLater()
+                self.analysis_tab._zz_warning_label = None
     
     def _update_connection_status(self):
-        """Update connection status by testing actual connection"""
+        """Update connection status, reconnecting to the last port if the link is down"""
         if not self.arduino:
             self._update_arduino_status(False, "Not initialized")
             return
             
-        # Test if actually connected
-        try:
-            if self.arduino.is_connected():
-                port = getattr(self.arduino, 'port', 'Unknown')
-                self._update_arduino_status(True, f"Connected ({port})")
+        if self.arduino.is_connected():
+            port = getattr(self.arduino, 'port', 'Unknown')
+            self._update_arduino_status(True, f"Connected ({port})")
+        else:
+            # Try to reconnect if we have a port
+            port = getattr(self.arduino, 'port', None)
+            if port:
+                self._request_reconnect(port)
             else:
-                # Try to reconnect if we have a port
-                port = getattr(self.arduino, 'port', None)
-                if port:
-                    try:
-                        if self.arduino.connect(port):
-                            self._update_arduino_status(True, f"Connected ({port})")
-                        else:
-                            self._update_arduino_status(False, "Not connected")
-                    except:
-                        self._update_arduino_status(False, "Not connected")
-                else:
-                    self._update_arduino_status(False, "Not connected")
-        except Exception as e:
-            self.logger.error(f"Error checking connection: {e}")
-            self._update_arduino_status(False, "Error")
+                self._update_arduino_status(False, "Not connected")
     
     def _update_arduino_status(self, connected, message):
         """Update Arduino connection status label"""
-        if self.arduino_status_label:
+        connected = bool(connected)
+        if connected != self._arduino_connected:
+            self._arduino_connected = connected
             if connected:
-                self.arduino_status_label.setText(f"Arduino: {message}")
-                self.arduino_status_label.setStyleSheet("color: #4fc3f7; font-size: 11px; padding: 4px 8px;")
-            else:
-                self.arduino_status_label.setText(f"Arduino: {message}")
-                self.arduino_status_label.setStyleSheet("color: #d04f4f; font-size: 11px; padding: 4px 8px;")
+                self._reconnect_backoff = 0.0
+                self._next_reconnect_attempt = 0.0
+            self.arduinoStateChanged.emit(connected)
+        if self.arduino_status_label:
+            self.arduino_status_label.setText(f"Arduino: {message}")
+            _set_state(self.arduino_status_label, "ok" if connected else "bad")
 
-    def _map_to_pwm(self, value_0_100):
-        """Map slider value (0-100) to PWM value (0-255)"""
-        return int((value_0_100 / 100.0) * 255)
+    def _queue_send(self, send_fn, name, value):
+        """Defer a slider-driven send; a newer value for the same channel replaces it"""
+        self._pending[name] = (send_fn, value)
+        self._send_timer.start()
 
-    def _on_enable_toggled(self, checked, slider, name):
+    def _flush_pending(self):
+        """Send the latest queued value of every channel"""
+        pending, self._pending = self._pending, {}
+        for name, (send_fn, value) in pending.items():
+            send_fn(name, value)
+
+    def _env_enable_slot(self, checked):
         """Handle enable checkbox toggle for environment controls"""
+        enable = self.sender()
+        name = enable.property("zimon_channel")
+        slider = self._enable_to_slider[enable]
+        slider.setEnabled(checked)
+        # the toggle sends the authoritative value; drop any queued slider value
+        self._pending.pop(name, None)
         if not checked:
-            # Disable slider and set value to 0
-            slider.setValue(0)
+            # Disable slider and set value to 0; the send below is the only one
+            with QSignalBlocker(slider):
+                slider.setValue(0)
             self._send_arduino_command(name, 0)
         else:
             # Send current slider value
             self._send_arduino_command(name, slider.value())
 
-    def _on_slider_changed(self, value, name):
+    def _env_slider_slot(self, value):
         """Handle slider value change for environment controls"""
-        if not self.arduino or not self.arduino.is_connected():
-            return
-        
-        # Check if enabled
-        enable_cb = None
-        if name == "IR Light":
-            enable_cb = self.ir_enable
-        elif name == "White Light":
-            enable_cb = self.white_enable
-        elif name == "Pump":
-            enable_cb = self.pump_enable
-        
-        if enable_cb and enable_cb.isChecked():
-            self._send_arduino_command(name, value)
+        name = self.sender().property("zimon_channel")
+        if self._arduino_connected and self._channel_enables[name].isChecked():
+            self._queue_send(self._send_arduino_command, name, value)
 
-    def _on_stimulus_enable_toggled(self, checked, slider, name):
+    def _stim_enable_slot(self, checked):
         """Handle enable checkbox toggle for stimulus controls"""
+        enable = self.sender()
+        name = enable.property("zimon_channel")
+        slider = self._enable_to_slider[enable]
+        slider.setEnabled(checked)
+        self._pending.pop(name, None)
         if not checked:
-            slider.setValue(0)
+            with QSignalBlocker(slider):
+                slider.setValue(0)
             self._send_stimulus_command(name, 0)
         else:
             self._send_stimulus_command(name, slider.value())
 
-    def _on_stimulus_slider_changed(self, value, name):
+    def _stim_slider_slot(self, value):
         """Handle slider value change for stimulus controls"""
-        if not self.arduino or not self.arduino.is_connected():
-            return
-        
-        enable_cb = None
-        if name == "Vibration":
-            enable_cb = self.vib_enable
-        elif name == "Buzzer":
-            enable_cb = self.buzzer_enable
-        elif name == "Heater":
-            enable_cb = self.heater_enable
-        
-        if enable_cb and enable_cb.isChecked():
-            self._send_stimulus_command(name, value)
+        name = self.sender().property("zimon_channel")
+        if self._arduino_connected and self._channel_enables[name].isChecked():
+            self._queue_send(self._send_stimulus_command, name, value)
 
     def _send_arduino_command(self, name, value_0_100):
         """Send command to Arduino for environment controls"""
@@ -716,31 +893,18 @@ class MainWindow(QMainWindow):
             self.logger.warning("Arduino controller not available")
             return
             
-        if not self.arduino.is_connected():
-            self.logger.warning("Arduino not connected - attempting reconnect...")
-            try:
-                if not self.arduino.auto_connect():
-                    self.logger.error("Failed to reconnect Arduino")
-                    return
-            except Exception as e:
-                self.logger.error(f"Reconnect error: {e}")
+        if not self._arduino_connected:
+            if time.monotonic() < self._next_reconnect_attempt:
                 return
+            # keep the value for when the worker has reconnected
+            self.logger.warning("Arduino not connected - attempting reconnect...")
+            self._pending[name] = (self._send_arduino_command, value_0_100)
+            self._request_reconnect()
+            return
         
-        pwm_value = self._map_to_pwm(value_0_100)
-        
-        cmd_map = {
-            "IR Light": f"IR {pwm_value}",
-            "White Light": f"WHITE {pwm_value}",
-            "Pump": f"PUMP {pwm_value}"
-        }
-        
-        cmd = cmd_map.get(name)
-        if cmd:
-            try:
-                reply = self.arduino.send(cmd)
-                self.logger.info(f"Arduino command: {cmd} -> {reply}")
-            except Exception as e:
-                self.logger.error(f"Failed to send Arduino command {cmd}: {e}", exc_info=True)
+        prefix = self._ENV_PREFIX.get(name)
+        if prefix:
+            self.requestSend.emit(name, f"{prefix} {_PWM_TABLE[value_0_100]}")
 
     def _send_stimulus_command(self, name, value_0_100):
         """Send command to Arduino for stimulus controls"""
@@ -748,65 +912,36 @@ class MainWindow(QMainWindow):
             self.logger.warning("Arduino controller not available")
             return
             
-        if not self.arduino.is_connected():
+        if not self._arduino_connected:
             self.logger.warning("Arduino not connected")
             return
         
-        pwm_value = self._map_to_pwm(value_0_100)
-        
-        # Map stimulus names to Arduino commands
-        # Note: Buzzer and Heater may not be implemented in Arduino yet
-        cmd_map = {
-            "Vibration": f"VIB {pwm_value}",
-            "Buzzer": None,  # Not implemented in Arduino firmware
-            "Heater": None   # Not implemented in Arduino firmware
-        }
-        
-        cmd = cmd_map.get(name)
-        if cmd:
-            try:
-                reply = self.arduino.send(cmd)
-                self.logger.info(f"Arduino command: {cmd} -> {reply}")
-            except Exception as e:
-                self.logger.error(f"Failed to send Arduino command {cmd}: {e}", exc_info=True)
-        elif cmd is None:
+        prefix = self._STIM_PREFIX.get(name)
+        if prefix:
+            self.requestSend.emit(name, f"{prefix} {_PWM_TABLE[value_0_100]}")
+        else:
             self.logger.warning(f"Stimulus '{name}' not implemented in Arduino firmware")
 
-    def _update_temperature(self):
-        """Update temperature display from Arduino"""
-        if not self.arduino:
-            if self.temp_label:
-                self.temp_label.setText("-- °C")
-            return
-            
-        # Check connection more reliably
-        is_connected = False
-        try:
-            if self.arduino.is_connected():
-                # Try a quick test to see if actually working
-                is_connected = True
-        except:
-            pass
-            
-        if not is_connected:
-            if self.temp_label:
-                self.temp_label.setText("-- °C")
-            # Only update status if we're sure it's disconnected
-            # Don't update on every temp check to avoid flickering
-            return
-        
-        try:
-            temp = self.arduino.read_temperature_c()
-            if temp is not None:
-                if self.temp_label:
-                    self.temp_label.setText(f"{temp:.1f} °C")
-            else:
-                if self.temp_label:
-                    self.temp_label.setText("-- °C")
-        except Exception as e:
-            self.logger.error(f"Failed to read temperature: {e}")
-            if self.temp_label:
-                self.temp_label.setText("ERR °C")
+    def _on_command_completed(self, name, cmd, reply):
+        self.logger.info(f"Arduino command: {cmd} -> {reply}")
+
+    def _on_command_failed(self, name, cmd, error):
+        self.logger.error(f"Failed to send Arduino command {cmd}: {error}")
+
+    def _set_temp_label(self, temp):
+        """Show a temperature reading pushed by the Arduino firmware"""
+        self._show_temp(f"{temp:.1f} °C")
+
+    def _show_temp(self, text):
+        # readings repeat far more often than the displayed tenth changes
+        if text != self._last_temp_str and self.temp_label:
+            self.temp_label.setText(text)
+            self._last_temp_str = text
+
+    def _on_arduino_lost(self):
+        """The serial link dropped underneath us"""
+        self._update_arduino_status(False, "Not connected")
+        self._show_temp("-- °C")
 
     def _on_start_experiment(self):
         """Handle start experiment button click"""
@@ -815,82 +950,39 @@ class MainWindow(QMainWindow):
             return
         
         # Build experiment config from UI state
-        # Collect active stimuli with their parameters
-        stimuli_config = {}
-        
-        # Vibration
-        if hasattr(self, 'vib_enable') and self.vib_enable and self.vib_enable.isChecked():
-            intensity = self.vib_slider.value() if self.vib_slider else 0
-            continuous = self.vib_continuous.isChecked() if self.vib_continuous else False
-            stimuli_config["VIB"] = {
-                "level": self._map_to_pwm(intensity),
-                "continuous": continuous,
-                "duration_ms": 0 if continuous else (self.vib_duration.value() if self.vib_duration else 0),
-                "delay_ms": 0 if continuous else (self.vib_delay.value() if self.vib_delay else 0)
-            }
-        
-        # Buzzer
-        if hasattr(self, 'buzzer_enable') and self.buzzer_enable and self.buzzer_enable.isChecked():
-            intensity = self.buzzer_slider.value() if self.buzzer_slider else 0
-            continuous = self.buzzer_continuous.isChecked() if self.buzzer_continuous else False
-            stimuli_config["BUZZER"] = {
-                "level": self._map_to_pwm(intensity),
-                "continuous": continuous,
-                "duration_ms": 0 if continuous else (self.buzzer_duration.value() if self.buzzer_duration else 0),
-                "delay_ms": 0 if continuous else (self.buzzer_delay.value() if self.buzzer_delay else 0)
-            }
+        # Collect active stimuli with their parameters into the reused config dicts
+        config = self._scratch_config
+        stimuli_config = config["stimuli"]
+        stimuli_config.clear()
         
-        # Heater
-        if hasattr(self, 'heater_enable') and self.heater_enable and self.heater_enable.isChecked():
-            intensity = self.heater_slider.value() if self.heater_slider else 0
-            continuous = self.heater_continuous.isChecked() if self.heater_continuous else False
-            stimuli_config["HEATER"] = {
-                "level": self._map_to_pwm(intensity),
-                "continuous": continuous,
-                "duration_ms": 0 if continuous else (self.heater_duration.value() if self.heater_duration else 0),
-                "delay_ms": 0 if continuous else (self.heater_delay.value() if self.heater_delay else 0)
-            }
+        for key, en_name, sl_name, cont_name, dur_name, dly_name in self._STIMULI_SPECS:
+            enable = getattr(self, en_name)
+            if not (enable and enable.isChecked()):
+                continue
+            cont = getattr(self, cont_name)
+            continuous = cont.isChecked() if cont else False
+            entry = self._scratch_stimuli[key]
+            entry["level"] = _PWM_TABLE[_val(getattr(self, sl_name))]
+            entry["continuous"] = continuous
+            entry["duration_ms"] = 0 if continuous else _val(getattr(self, dur_name))
+            entry["delay_ms"] = 0 if continuous else _val(getattr(self, dly_name))
+            stimuli_config[key] = entry
         
         # Calculate experiment duration (long enough for all stimuli)
         max_duration = 60  # Default 60 seconds
         if stimuli_config:
             # For now, use a reasonable default, could calculate from stimuli
             max_duration = 300  # 5 minutes default
-        
-        config = {
-            "duration_s": max_duration,
-            "stimuli": stimuli_config
-        }
+        config["duration_s"] = max_duration
         
         try:
-            if self.runner.start(config):
-                self.start_btn.setEnabled(False)
-                self.stop_btn.setEnabled(True)
-                
-                # Update status
-                if hasattr(self, 'experiment_status_indicator'):
-                    self.experiment_status_indicator.setStyleSheet("color: #4fc3f7; font-size: 14px;")
-                    self.experiment_status_text.setText("Running")
-                
-                # Update active stimuli display
-                if hasattr(self, 'active_stimuli_list'):
-                    active_stimuli_names = list(stimuli_config.keys())
-                    if active_stimuli_names:
-                        self.active_stimuli_list.setText(", ".join(active_stimuli_names))
-                    else:
-                        self.active_stimuli_list.setText("None")
+            if self.runner.start(dict(config)):
+                self._set_experiment_state(True, list(stimuli_config.keys()))
                 
                 # Start timer
-                self.experiment_start_time = time.time()
-                if not self.experiment_timer:
-                    self.experiment_timer = QTimer()
-                    self.experiment_timer.timeout.connect(self._update_experiment_timer)
-                self.experiment_timer.start(1000)  # Update every second
-                
-                # Update recording status
-                if hasattr(self, 'recording_status'):
-                    self.recording_status.setText("● Recording")
-                    self.recording_status.setStyleSheet("color: #4fc3f7; font-size: 11px;")
+                self.experiment_start_time = time.monotonic()
+                self._last_elapsed_s = 0
+                self.experiment_timer.start()
                 
                 self.logger.info("Experiment started")
             else:
@@ -905,38 +997,68 @@ class MainWindow(QMainWindow):
         
         try:
             self.runner.stop()
-            self.start_btn.setEnabled(True)
-            self.stop_btn.setEnabled(False)
-            
-            # Update status
-            if hasattr(self, 'experiment_status_indicator'):
-                self.experiment_status_indicator.setStyleSheet("color: #9aa0aa; font-size: 14px;")
-                self.experiment_status_text.setText("Not Running")
             
             # Stop timer
-            if self.experiment_timer:
-                self.experiment_timer.stop()
-            if hasattr(self, 'experiment_timer_label'):
-                self.experiment_timer_label.setText("Duration: 00:00")
+            self.experiment_timer.stop()
             self.experiment_start_time = None
             
-            # Update recording status
-            if hasattr(self, 'recording_status'):
-                self.recording_status.setText("● Not Recording")
-                self.recording_status.setStyleSheet("color: #d04f4f; font-size: 11px;")
-            
-            # Clear active stimuli
-            if hasattr(self, 'active_stimuli_list'):
-                self.active_stimuli_list.setText("None")
+            self._set_experiment_state(False)
             
             self.logger.info("Experiment stopped")
         except Exception as e:
             self.logger.error(f"Error stopping experiment: {e}")
+
+    def _set_experiment_state(self, running, active_stimuli=()):
+        """Switch the experiment controls and status panel between running and idle in one repaint"""
+        central = self.centralWidget()
+        central.setUpdatesEnabled(False)
+        try:
+            self._set_enabled(self.start_btn, not running)
+            self._set_enabled(self.stop_btn, running)
+            
+            state = "ok" if running else "idle"
+            for widget in self._experiment_state_widgets:
+                _set_state(widget, state)
+            self._set_text(self.experiment_status_text, "Running" if running else "Not Running")
+            self._set_text(self.active_stimuli_list, ", ".join(active_stimuli) if active_stimuli else "None")
+            self._set_text(self.recording_status, "● Recording" if running else "● Not Recording")
+            if not running:
+                self._set_text(self.experiment_timer_label, "Duration: 00:00")
+        finally:
+            central.setUpdatesEnabled(True)
+
+    # Qt repaints on setText/setEnabled even when nothing changes; these skip no-op updates
+    def _set_text(self, widget, text):
+        key = (id(widget), "text")
+        if self._ui_state.get(key) != text:
+            self._ui_state[key] = text
+            widget.setText(text)
+
+    def _set_enabled(self, widget, enabled):
+        key = (id(widget), "enabled")
+        if self._ui_state.get(key) != enabled:
+            self._ui_state[key] = enabled
+            widget.setEnabled(enabled)
     
     def _update_experiment_timer(self):
-        """Update experiment timer display"""
-        if self.experiment_start_time and hasattr(self, 'experiment_timer_label'):
-            elapsed = time.time() - self.experiment_start_time
-            minutes = int(elapsed // 60)
-            seconds = int(elapsed % 60)
-            self.experiment_timer_label.setText(f"Duration: {minutes:02d}:{seconds:02d}")
+        """Update experiment timer display and schedule the next tick for the next second boundary"""
+        if self.experiment_start_time is None:
+            return
+        elapsed = time.monotonic() - self.experiment_start_time
+        elapsed_s = int(elapsed)
+        if elapsed_s != self._last_elapsed_s:
+            self._last_elapsed_s = elapsed_s
+            minutes, seconds = divmod(elapsed_s, 60)
+            self._set_text(self.experiment_timer_label, f"Duration: {minutes:02d}:{seconds:02d}")
+        self.experiment_timer.start(1000 - int((elapsed * 1000) % 1000))
+
+    def closeEvent(self, event):
+        """Stop the Arduino worker thread before the window goes away"""
+        if self._arduino_thread is not None:
+            # The timer belongs to the worker thread, so stop it there; this also
+            # waits out a reconnect that is still probing ports
+            QMetaObject.invokeMethod(self._arduino_worker, "stop_polling",
+                                     Qt.ConnectionType.BlockingQueuedConnection)
+            self._arduino_thread.quit()
+            self._arduino_thread.wait()
+        super().closeEvent(event)
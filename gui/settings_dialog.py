@@ -3,11 +3,27 @@ from PyQt6.QtWidgets import (
     QPushButton, QComboBox, QGroupBox, QMessageBox, QFileDialog, QLineEdit
 )
 from PyQt6.QtCore import Qt
-import serial.tools.list_ports
 import logging
 import os
 
 
+def _list_port_devices(force: bool = False):
+    """
+    Device names of the available serial ports.
+    
+    pyserial is imported on first use, and the enumeration is shared with
+    ArduinoController's short-lived port cache (force bypasses it).
+    """
+    try:
+        from backend.arduino_controller import _cached_comports, _invalidate_port_cache
+    except ImportError as e:
+        logging.getLogger("settings_dialog").warning(f"Serial support unavailable: {e}")
+        return []
+    if force:
+        _invalidate_port_cache()
+    return [p.device for p in _cached_comports(ttl=2.0)]
+
+
 class SettingsDialog(QDialog):
     def __init__(self, arduino_controller, parent=None, zebrazoom_integration=None):
         super().__init__(parent)
@@ -149,7 +165,7 @@ class SettingsDialog(QDialog):
         
         refresh_btn = QPushButton("Refresh")
         refresh_btn.setMinimumWidth(80)
-        refresh_btn.clicked.connect(self._refresh_ports)
+        refresh_btn.clicked.connect(lambda: self._refresh_ports(force=True))
         
         port_layout.addWidget(port_label)
         port_layout.addWidget(self.port_combo, 1)
@@ -287,10 +303,10 @@ class SettingsDialog(QDialog):
         # Update UI state
         self._update_ui_state()
         
-    def _refresh_ports(self):
+    def _refresh_ports(self, force: bool = False):
         """Refresh the list of available serial ports"""
         self.port_combo.clear()
-        ports = [p.device for p in serial.tools.list_ports.comports()]
+        ports = _list_port_devices(force)
         
         if ports:
             self.port_combo.addItems(ports)
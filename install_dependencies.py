@@ -29,8 +29,11 @@ def main():
     packages = [
         "pyqt6",
         "pyserial",
+        "pyserial-asyncio",
         "opencv-python",
         "numpy",
+        "numba",
+        "numexpr",
         "pandas",
         "scipy",
         "scikit-learn",